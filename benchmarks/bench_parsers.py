@@ -0,0 +1,36 @@
+"""
+parser バックエンドごとの 1 ページ（既定 1000 entry）あたりのパース + 行抽出時間。
+
+    python benchmarks/bench_parsers.py [--entries 1000] [--repeat 5]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from bench_xml import make_page
+
+from j_staget._columns import ColumnBuilder
+from j_staget._parsers import PARSERS, parse_page
+
+
+def main() -> None:
+    p = argparse.ArgumentParser()
+    p.add_argument("--entries", type=int, default=1000)
+    p.add_argument("--repeat", type=int, default=5)
+    args = p.parse_args()
+
+    content = make_page(args.entries)
+    for name in PARSERS:
+        best = float("inf")
+        for _ in range(args.repeat):
+            rows = ColumnBuilder()
+            t0 = time.perf_counter()
+            parse_page(content, rows, args.entries, name)
+            rows.to_frame()
+            best = min(best, time.perf_counter() - t0)
+        print(f"{name:<10} {best * 1e3:8.1f} ms/page  ({best / args.entries * 1e6:.1f} us/entry)")
+
+
+if __name__ == "__main__":
+    main()
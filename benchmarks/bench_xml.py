@@ -0,0 +1,120 @@
+"""
+entry 1件あたりの行抽出コストを測るマイクロベンチマーク。
+
+    python benchmarks/bench_xml.py [--entries 1000] [--repeat 5]
+
+"strings" は文字列の XPath を毎回 entry.xpath() に渡す従来方式、
+"compiled" は j_staget._xml のコンパイル済み XPath を列ごとに評価する方式（row_xpath）、
+"childwalk" は entry の子を 1 回だけ走査する方式（extract_row）。
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from lxml import etree
+
+from j_staget._header import NS
+from j_staget._xml import extract_row, row_xpath
+
+ENTRY = (
+    "<entry>"
+    "<article_title><en><![CDATA[Title {i}]]></en><ja><![CDATA[題名 {i}]]></ja></article_title>"
+    "<article_link><en>https://example.org/en/{i}</en><ja>https://example.org/ja/{i}</ja></article_link>"
+    "<author><en><name>Taro</name><name>Hanako</name></en><ja><name>太郎</name><name>花子</name></ja></author>"
+    "<cdjournal>jnl</cdjournal>"
+    "<material_title><en>Journal</en><ja>雑誌</ja></material_title>"
+    "<prism:issn>1234-5678</prism:issn><prism:eIssn>8765-4321</prism:eIssn>"
+    "<prism:volume>12</prism:volume><cdvols>12_3</cdvols><prism:number>3</prism:number>"
+    "<prism:startingPage>{i}</prism:startingPage><prism:endingPage>{i}</prism:endingPage>"
+    "<pubyear>2001</pubyear><prism:doi>10.1234/x.{i}</prism:doi>"
+    "</entry>"
+)
+
+
+def make_page(n: int) -> bytes:
+    body = "".join(ENTRY.format(i=i) for i in range(n))
+    return (
+        '<feed xmlns="http://www.w3.org/2005/Atom" '
+        'xmlns:prism="http://prismstandard.org/namespaces/basic/2.0/">' + body + "</feed>"
+    ).encode("utf-8")
+
+
+# --- 従来方式（文字列 XPath を毎回評価） ---
+
+def _texts(entry, q, ns=None):
+    out = []
+    for v in entry.xpath(q, namespaces=ns) if ns else entry.xpath(q):
+        t = v if isinstance(v, str) else getattr(v, "text", None)
+        if t and t.strip():
+            out.append(t.strip())
+    return out
+
+
+def _first_ns(entry, q):
+    vals = [n.text for n in entry.xpath(q, namespaces=NS) if getattr(n, "text", None)]
+    return vals[0] if vals else None
+
+
+def _pick(entry, tag):
+    ja = _texts(entry, f"./*[local-name()='{tag}']/*[local-name()='ja']/text()")
+    if ja:
+        return ja[0]
+    vals = _texts(entry, f"./*[local-name()='{tag}']//text()")
+    return vals[0] if vals else None
+
+
+def row_strings(entry) -> dict:
+    authors = _texts(entry, "./*[local-name()='author']/*[local-name()='ja']/*[local-name()='name']/text()")
+    if not authors:
+        authors = _texts(entry, "./*[local-name()='author']/*[local-name()='name']/text()")
+    return {
+        "author": authors,
+        "article_title": _pick(entry, "article_title"),
+        "material_title": _pick(entry, "material_title"),
+        "cdjournal": _first_ns(entry, "atom:cdjournal"),
+        "p_issn": _first_ns(entry, "prism:issn"),
+        "o_issn": _first_ns(entry, "prism:eIssn"),
+        "article_link": _pick(entry, "article_link"),
+        "pubyear": _first_ns(entry, "atom:pubyear"),
+        "doi": _first_ns(entry, "prism:doi"),
+        "volume": _first_ns(entry, "prism:volume"),
+        "cdvols": entry.xpath("./*[local-name()='cdvols']/text()")[0].strip()
+        if entry.xpath("./*[local-name()='cdvols']/text()")
+        else None,
+        "number": _first_ns(entry, "prism:number"),
+        "starting_page": _first_ns(entry, "prism:startingPage"),
+        "ending_page": _first_ns(entry, "prism:endingPage"),
+    }
+
+
+def bench(name: str, extract, entries: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for e in entries:
+            extract(e)
+        best = min(best, time.perf_counter() - t0)
+    per = best / len(entries) * 1e6
+    print(f"{name:<10} {per:8.2f} us/entry  ({best * 1e3:.1f} ms / {len(entries)} entries)")
+    return per
+
+
+def main() -> None:
+    p = argparse.ArgumentParser()
+    p.add_argument("--entries", type=int, default=1000)
+    p.add_argument("--repeat", type=int, default=5)
+    args = p.parse_args()
+
+    root = etree.fromstring(make_page(args.entries))
+    entries = root.xpath("//atom:entry", namespaces=NS)
+    assert row_strings(entries[0]) == row_xpath(entries[0]) == extract_row(entries[0])
+
+    base = bench("strings", row_strings, entries, args.repeat)
+    for name, extract in (("compiled", row_xpath), ("childwalk", extract_row)):
+        per = bench(name, extract, entries, args.repeat)
+        print(f"{'':<10} {base / per:8.2f}x vs strings")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,82 @@
-from .client import FetchResult, JStageAPIError, fetch
+from __future__ import annotations
 
-__all__ = ["fetch", "FetchResult", "JStageAPIError"]
+import importlib
+from typing import TYPE_CHECKING
+
+from ._count import count
+from ._errors import (
+    JStageAPIError,
+    JStageQueryError,
+    JStageResultError,
+    JStageServerError,
+)
+from .cache import PageCache, ResponseCache, ResultCache
+from .ratelimit import FileRateLimiter, RateLimiter
+from .retry import RetryPolicy
+from .store import SQLiteStore
+from .writers import (
+    ArrowStreamPageWriter,
+    HivePartitionedWriter,
+    NDJSONPageWriter,
+    ParquetPageWriter,
+)
+
+if TYPE_CHECKING:
+    from ._aio import afetch, aiter_pages
+    from ._batch import fetch_many
+    from ._shard import fetch_sharded
+    from .client import FetchResult, fetch, iter_pages, iter_records
+
+# Polars を使うものは最初に参照されたときに import する（count だけなら Polars を読まない）
+_LAZY = {
+    "fetch": "client",
+    "FetchResult": "client",
+    "iter_pages": "client",
+    "iter_records": "client",
+    "afetch": "_aio",
+    "aiter_pages": "_aio",
+    "fetch_sharded": "_shard",
+    "fetch_many": "_batch",
+}
+
+__all__ = [
+    "fetch",
+    "iter_pages",
+    "iter_records",
+    "afetch",
+    "aiter_pages",
+    "fetch_sharded",
+    "fetch_many",
+    "count",
+    "FetchResult",
+    "JStageAPIError",
+    "JStageResultError",
+    "JStageQueryError",
+    "JStageServerError",
+    "RateLimiter",
+    "FileRateLimiter",
+    "RetryPolicy",
+    "ResponseCache",
+    "PageCache",
+    "ResultCache",
+    "ParquetPageWriter",
+    "NDJSONPageWriter",
+    "ArrowStreamPageWriter",
+    "HivePartitionedWriter",
+    "SQLiteStore",
+]
 __version__ = "0.1.0"
+
+
+def __getattr__(name: str):
+    try:
+        module = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+
+import polars as pl
+import requests
+
+from ._columns import ColumnBuilder
+from ._parsers import PageInfo
+from ._query import PagePlan, _build_params, _page_url
+from .cache import PageCache, ResponseCache
+from .client import (
+    DEFAULT_STEP,
+    FetchResult,
+    _get_page,
+    _is_no_results,
+    _Page,
+    _pooled_session,
+    _validate,
+)
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+
+
+async def _apages(
+    base_params: dict[str, str],
+    *,
+    max_records: int,
+    limiter: RateLimiter,
+    retry: RetryPolicy | None,
+    cache: ResponseCache | None,
+    page_cache: PageCache | None,
+    step: int,
+    timeout: float,
+    session: requests.Session,
+    parser: str,
+    stream: bool,
+    concurrency: int,
+) -> AsyncIterator[_Page]:
+    """ページを start 順に返す。ERR_001 なら no_results のページを返して終わる。"""
+    async def get(start: int, count: int) -> tuple[PageInfo, pl.DataFrame]:
+        # リトライの待ちも含めてワーカースレッドで行う
+        return await asyncio.to_thread(
+            _get_page,
+            session,
+            _page_url(base_params, start, count),
+            count,
+            parser=parser,
+            timeout=timeout,
+            stream=stream,
+            limiter=limiter,
+            retry=retry,
+            cache=cache,
+            page_cache=page_cache,
+        )
+
+    # client._iter_pages と同じ PagePlan で取る
+    plan = PagePlan(max_records, step)
+    while (nxt := plan.next_page()) is not None:
+        start, count = nxt
+        page, df = await get(start, count)
+        if _is_no_results(page):
+            yield _Page(start, count, df, 0, no_results=True)
+            return
+        plan.record(count, page.total_results, df.height)
+        yield _Page(start, count, df, plan.total_results)
+
+    windows = plan.windows()
+    if not windows:
+        return
+    total = plan.total_results
+    sem = asyncio.Semaphore(concurrency)
+
+    async def bounded(start: int, count: int) -> tuple[PageInfo, pl.DataFrame]:
+        async with sem:
+            return await get(start, count)
+
+    tasks = [asyncio.ensure_future(bounded(s, c)) for s, c in windows]
+    try:
+        # 完了順ではなく start 順に組み立てる
+        for (s, c), task in zip(windows, tasks):
+            page, df = await task
+            if _is_no_results(page):
+                yield _Page(s, c, df, 0, no_results=True)
+                return
+            yield _Page(s, c, df, total)
+            if not df.height:
+                return
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def aiter_pages(
+    target_word: str | None = None,
+    *,
+    year: int = 1950,
+    year_to: int | None = None,
+    field: str = "article",
+    max_records: int = 20000,
+    sleep: float = 5.0,
+    step: int = DEFAULT_STEP,
+    timeout: float = 30.0,
+    session: requests.Session | None = None,
+    material: str | None = None,
+    author: str | None = None,
+    affil: str | None = None,
+    issn: str | None = None,
+    cdjournal: str | None = None,
+    parser: str = "auto",
+    stream: bool = False,
+    concurrency: int = 4,
+    rate_limiter: RateLimiter | None = None,
+    retry: RetryPolicy | None = None,
+    cache: ResponseCache | None = None,
+    page_cache: PageCache | None = None,
+) -> AsyncIterator[pl.DataFrame]:
+    """
+    Async iterator over J-STAGE Search API pages, one typed DataFrame per page.
+
+    After the first page reports totalResults, the remaining pages are
+    requested concurrently (at most ``concurrency`` in flight, paced by
+    ``rate_limiter`` or one request start every ``sleep`` seconds) and
+    yielded in ``start`` order.
+    Arguments are the same as :func:`j_staget.fetch`.
+    """
+    _validate(max_records=max_records, step=step, parser=parser)
+    if concurrency <= 0:
+        raise ValueError("concurrency must be > 0")
+    base_params = _build_params(
+        target_word,
+        year=year,
+        year_to=year_to,
+        field=field,
+        material=material,
+        author=author,
+        affil=affil,
+        issn=issn,
+        cdjournal=cdjournal,
+    )
+
+    owns_session = session is None
+    if owns_session:
+        session = _pooled_session(concurrency)
+    try:
+        async for page in _apages(
+            base_params,
+            max_records=max_records,
+            limiter=rate_limiter if rate_limiter is not None else RateLimiter.from_interval(sleep),
+            retry=retry,
+            cache=cache,
+            page_cache=page_cache,
+            step=step,
+            timeout=timeout,
+            session=session,
+            parser=parser,
+            stream=stream,
+            concurrency=concurrency,
+        ):
+            if page.df.height:
+                yield page.df
+    finally:
+        if owns_session:
+            session.close()
+
+
+async def afetch(
+    target_word: str | None = None,
+    *,
+    year: int = 1950,
+    year_to: int | None = None,
+    field: str = "article",
+    max_records: int = 20000,
+    sleep: float = 5.0,
+    step: int = DEFAULT_STEP,
+    timeout: float = 30.0,
+    session: requests.Session | None = None,
+    material: str | None = None,
+    author: str | None = None,
+    affil: str | None = None,
+    issn: str | None = None,
+    cdjournal: str | None = None,
+    parser: str = "auto",
+    stream: bool = False,
+    concurrency: int = 4,
+    rate_limiter: RateLimiter | None = None,
+    retry: RetryPolicy | None = None,
+    cache: ResponseCache | None = None,
+    page_cache: PageCache | None = None,
+) -> FetchResult:
+    """
+    Asynchronous :func:`j_staget.fetch`. Pages after the first are fetched
+    concurrently (see :func:`aiter_pages`); the result is identical to fetch.
+    """
+    _validate(max_records=max_records, step=step, parser=parser)
+    if concurrency <= 0:
+        raise ValueError("concurrency must be > 0")
+    base_params = _build_params(
+        target_word,
+        year=year,
+        year_to=year_to,
+        field=field,
+        material=material,
+        author=author,
+        affil=affil,
+        issn=issn,
+        cdjournal=cdjournal,
+    )
+
+    owns_session = session is None
+    if owns_session:
+        session = _pooled_session(concurrency)
+    try:
+        frames: list[pl.DataFrame] = []
+        total_results: int | None = None
+        async for page in _apages(
+            base_params,
+            max_records=max_records,
+            limiter=rate_limiter if rate_limiter is not None else RateLimiter.from_interval(sleep),
+            retry=retry,
+            cache=cache,
+            page_cache=page_cache,
+            step=step,
+            timeout=timeout,
+            session=session,
+            parser=parser,
+            stream=stream,
+            concurrency=concurrency,
+        ):
+            # client.fetch と同じく、ERR_001 なら途中までのページも捨てて 0 件にする（_apages はここで終わる）
+            if page.no_results:
+                frames, total_results = [], 0
+                continue
+            if total_results is None:
+                total_results = page.total_results
+            if page.df.height:
+                frames.append(page.df)
+    finally:
+        if owns_session:
+            session.close()
+
+    df = pl.concat(frames) if frames else ColumnBuilder().to_frame()
+    if total_results is None:
+        total_results = df.height
+    return FetchResult(df=df, total_results=total_results)
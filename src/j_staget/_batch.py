@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any
+
+import requests
+
+from .cache import PageCache, ResponseCache
+from .client import FetchResult, _pooled_session, fetch
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+
+# ジョブごとには指定できない（全ジョブで共有する）引数
+SHARED_ARGS = frozenset({"session", "rate_limiter", "sleep"})
+
+
+def fetch_many(
+    queries: Iterable[Mapping[str, Any]],
+    *,
+    workers: int = 4,
+    sleep: float = 5.0,
+    rate_limiter: RateLimiter | None = None,
+    retry: RetryPolicy | None = None,
+    cache: ResponseCache | None = None,
+    page_cache: PageCache | None = None,
+    session: requests.Session | None = None,
+    on_result: Callable[[int, FetchResult], None] | None = None,
+    return_exceptions: bool = False,
+) -> list[FetchResult | BaseException]:
+    """
+    Run many :func:`j_staget.fetch` calls as one batch.
+
+    Each element of ``queries`` is a dict of keyword arguments for fetch
+    (``target_word``, ``year``, ``max_records``, ...). The jobs run on a pool
+    of ``workers`` threads over one pooled ``requests.Session`` and one rate
+    limiter (``rate_limiter``, or one request start every ``sleep`` seconds
+    across all jobs), so connections are reused and jobs overlap. ``retry``,
+    ``cache`` and ``page_cache`` apply to jobs that do not set their own.
+
+    ``on_result(index, result)`` is called in the calling thread as soon as
+    each job finishes, e.g. to write its output. Results are returned in the
+    order of ``queries``. If a job fails, the jobs not yet started are
+    cancelled and the error is raised; with ``return_exceptions=True`` the
+    exception is put in the job's slot instead and the batch continues.
+    """
+    jobs = [dict(q) for q in queries]
+    if workers <= 0:
+        raise ValueError("workers must be > 0")
+    for i, job in enumerate(jobs):
+        shared = SHARED_ARGS & job.keys()
+        if shared:
+            raise ValueError(f"job {i}: {sorted(shared)} are shared by the batch and cannot be set per job")
+        job.setdefault("retry", retry)
+        job.setdefault("cache", cache)
+        job.setdefault("page_cache", page_cache)
+
+    limiter = rate_limiter if rate_limiter is not None else RateLimiter.from_interval(sleep)
+    owns_session = session is None
+    if owns_session:
+        session = _pooled_session(workers)
+
+    results: list[FetchResult | BaseException | None] = [None] * len(jobs)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(fetch, session=session, rate_limiter=limiter, **job): i for i, job in enumerate(jobs)}
+            try:
+                for fut in as_completed(futures):
+                    i = futures[fut]
+                    try:
+                        results[i] = fut.result()
+                    except Exception as e:
+                        if not return_exceptions:
+                            raise
+                        results[i] = e
+                        continue
+                    if on_result is not None:
+                        on_result(i, results[i])
+            finally:
+                # 失敗・中断したら、まだ始まっていないジョブは取り消す
+                for fut in futures:
+                    fut.cancel()
+    finally:
+        if owns_session:
+            session.close()
+    return results
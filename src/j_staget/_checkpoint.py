@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import polars as pl
+
+MANIFEST = "manifest.json"
+
+
+@dataclass
+class CheckpointState:
+    frames: list[pl.DataFrame] = field(default_factory=list)
+    next_start: int = 1
+    total_results: int | None = None
+    complete: bool = False
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class Checkpoint:
+    """
+    取得済みページを directory に 1 ページ 1 ファイル（parquet）で保存する。
+    manifest.json にはクエリ・次の start・totalResults・保存済みページを持ち、
+    ページファイルを書いてから manifest を差し替えるので、途中で落ちても
+    manifest に載っているページは必ず読める。
+    """
+
+    def __init__(self, directory: str | os.PathLike, query: dict) -> None:
+        self.dir = Path(directory)
+        self.query = query
+        self._pages: list[str] = []
+
+    @property
+    def _manifest_path(self) -> Path:
+        return self.dir / MANIFEST
+
+    def load(self) -> CheckpointState:
+        """保存済みの状態を読む。manifest が無ければ最初から。"""
+        if not self._manifest_path.exists():
+            return CheckpointState()
+        m = json.loads(self._manifest_path.read_text(encoding="utf-8"))
+        if m.get("query") != self.query:
+            raise ValueError(f"checkpoint in {self.dir} was created for a different query: {m.get('query')}")
+        self._pages = list(m["pages"])
+        return CheckpointState(
+            frames=[pl.read_parquet(self.dir / name) for name in self._pages],
+            next_start=int(m["next_start"]),
+            total_results=m.get("total_results"),
+            complete=bool(m.get("complete")),
+        )
+
+    def reset(self) -> None:
+        """前回の manifest とページファイルを消して空の状態から始める。"""
+        if self.dir.exists():
+            self._manifest_path.unlink(missing_ok=True)
+            for p in self.dir.glob("page-*.parquet"):
+                p.unlink()
+        self._pages = []
+
+    def commit(self, start: int, df: pl.DataFrame, *, next_start: int, total_results: int | None) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        if df.height:
+            name = f"page-{start:09d}.parquet"
+            tmp = self.dir / (name + ".tmp")
+            df.write_parquet(tmp)
+            os.replace(tmp, self.dir / name)
+            self._pages.append(name)
+        self._write_manifest(next_start=next_start, total_results=total_results, complete=False)
+
+    def finish(self, total_results: int | None) -> None:
+        """最後まで取得できたことを記録する（resume しても再取得しない）。"""
+        m = json.loads(self._manifest_path.read_text(encoding="utf-8")) if self._manifest_path.exists() else {}
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._write_manifest(next_start=m.get("next_start", 1), total_results=total_results, complete=True)
+
+    def _write_manifest(self, *, next_start: int, total_results: int | None, complete: bool) -> None:
+        m = {
+            "query": self.query,
+            "next_start": next_start,
+            "total_results": total_results,
+            "pages": self._pages,
+            "complete": complete,
+        }
+        _write_atomic(self._manifest_path, json.dumps(m, ensure_ascii=False, indent=2).encode("utf-8"))
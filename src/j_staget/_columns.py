@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import re
+from array import array
+from collections.abc import Sequence
+
+import polars as pl
+
+# fetch が返す列（この順で DataFrame になる。url_doi は後段で付与）
+COLUMNS = (
+    "author",
+    "article_title",
+    "material_title",
+    "cdjournal",
+    "p_issn",
+    "o_issn",
+    "article_link",
+    "pubyear",
+    "doi",
+    "volume",
+    "cdvols",
+    "number",
+    "starting_page",
+    "ending_page",
+)
+
+# (namespace, localname) が完全一致する要素から取る列（最初の非空 .text をそのまま使う）
+NS_FIELDS = {
+    ("atom", "cdjournal"): "cdjournal",
+    ("prism", "issn"): "p_issn",
+    ("prism", "eIssn"): "o_issn",
+    ("atom", "pubyear"): "pubyear",
+    ("prism", "doi"): "doi",
+    ("prism", "volume"): "volume",
+    ("prism", "number"): "number",
+    ("prism", "startingPage"): "starting_page",
+    ("prism", "endingPage"): "ending_page",
+}
+
+# localname だけで拾う列（ja 優先 -> 最初のテキスト）
+PICK_TAGS = ("article_title", "material_title", "article_link")
+
+INT_COLUMNS = ("pubyear", "starting_page", "ending_page")
+
+# fetch が返す DataFrame のスキーマ（url_doi は doi から作る）
+SCHEMA: dict[str, pl.DataType] = {
+    c: pl.List(pl.Utf8) if c == "author" else pl.Int32 if c in INT_COLUMNS else pl.Utf8
+    for c in COLUMNS
+}
+SCHEMA["url_doi"] = pl.Utf8
+
+# polars の Utf8 -> Int32 (strict=False) と同じく、符号付き ASCII 数字だけを数値とみなす
+_INT_RE = re.compile(r"[+-]?[0-9]+")
+_I32_MIN, _I32_MAX = -(2**31), 2**31 - 1
+
+
+def _to_i32(s: str | None) -> int | None:
+    if s is None or not _INT_RE.fullmatch(s):
+        return None
+    v = int(s)
+    return v if _I32_MIN <= v <= _I32_MAX else None
+
+
+class ColumnBuilder:
+    """
+    行（COLUMNS 順の値）を列ごとのバッファに直接積む。
+    author はフラットな値 + オフセット、整数列は array('i') + null 位置で持つ。
+    """
+
+    def __init__(self) -> None:
+        self._author_values: list[str] = []
+        self._author_offsets = array("q", [0])
+        self._ints = {c: array("i") for c in INT_COLUMNS}
+        self._int_nulls: dict[str, list[int]] = {c: [] for c in INT_COLUMNS}
+        self._strs: dict[str, list[str | None]] = {c: [] for c in COLUMNS if SCHEMA[c] == pl.Utf8}
+        self._slots = [
+            (c, "author" if c == "author" else "int" if c in INT_COLUMNS else "str") for c in COLUMNS
+        ]
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def append(self, values: Sequence) -> None:
+        n = self._n
+        for (col, kind), v in zip(self._slots, values):
+            if kind == "str":
+                self._strs[col].append(v)
+            elif kind == "int":
+                iv = _to_i32(v)
+                if iv is None:
+                    self._ints[col].append(0)
+                    self._int_nulls[col].append(n)
+                else:
+                    self._ints[col].append(iv)
+            else:
+                self._author_values.extend(v)
+                self._author_offsets.append(len(self._author_values))
+        self._n = n + 1
+
+    def _author_lists(self) -> list[list[str]]:
+        vals, off = self._author_values, self._author_offsets
+        return [vals[off[i] : off[i + 1]] for i in range(self._n)]
+
+    def to_frame(self) -> pl.DataFrame:
+        """スキーマ付きの DataFrame にする（0 件でも列と型は揃う）。"""
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            author = pl.Series("author", self._author_lists(), dtype=SCHEMA["author"])
+        else:
+            author = pl.Series("author", self._author_arrow())
+
+        cols: list[pl.Series] = []
+        for c in COLUMNS:
+            if c == "author":
+                cols.append(author)
+            elif c in INT_COLUMNS:
+                s = pl.Series(c, self._ints[c], dtype=pl.Int32)
+                if self._int_nulls[c]:
+                    s = s.scatter(self._int_nulls[c], None)
+                cols.append(s)
+            else:
+                cols.append(pl.Series(c, self._strs[c], dtype=pl.Utf8))
+
+        df = pl.DataFrame(cols)
+        return df.with_columns(
+            pl.when(pl.col("doi").is_not_null())
+            .then(pl.concat_str([pl.lit("https://doi.org/"), pl.col("doi")]))
+            .otherwise(None)
+            .alias("url_doi")
+        )
+
+    def _author_arrow(self):
+        import pyarrow as pa
+
+        return pa.LargeListArray.from_arrays(
+            pa.array(self._author_offsets, type=pa.int64()),
+            pa.array(self._author_values, type=pa.large_string()),
+        )
+
+    def to_arrow(self):
+        """pyarrow.Table にする（pyarrow が必要）。"""
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("to_arrow() requires pyarrow: pip install pyarrow") from e
+        return self.to_frame().to_arrow()
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from xml.parsers import expat
+
+import requests
+
+from ._errors import JStageAPIError, check_status
+from ._header import Header, HeaderProbe
+from ._query import _build_params, _page_url
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy, with_retry
+
+# ヘッダは先頭の数百バイトに収まる
+PROBE_CHUNK = 1024
+
+
+def _get_header(session: requests.Session, url: str, *, timeout: float) -> Header:
+    """url を取得し、ヘッダを読み終えた時点で受信を打ち切る。"""
+    try:
+        r = session.get(url, timeout=timeout, stream=True)
+        r.raise_for_status()
+    except requests.RequestException as e:
+        raise JStageAPIError(f"Request failed: {e}") from e
+
+    probe = HeaderProbe()
+    try:
+        try:
+            for chunk in r.iter_content(chunk_size=PROBE_CHUNK):
+                if probe.feed(chunk):
+                    break
+            # 本文を読むパーサが無いので、壊れた XML はここでエラーにする
+            return probe.close(strict=True)
+        except requests.RequestException as e:
+            raise JStageAPIError(f"Request failed: {e}") from e
+        except (expat.ExpatError, ValueError) as e:
+            # 壊れた XML や数値でない totalResults（fetch と同じく JStageAPIError にする）
+            raise JStageAPIError("Failed to parse XML response") from e
+    finally:
+        r.close()
+
+
+def _probe_total(
+    session: requests.Session,
+    base_params: dict[str, str],
+    *,
+    timeout: float,
+    limiter: RateLimiter | None,
+    retry: RetryPolicy | None,
+) -> int | None:
+    """base_params の件数を count=1 のリクエスト 1 回で調べる（ERR_001 は 0）。"""
+    url = _page_url(base_params, 1, 1)
+    h = with_retry(lambda: _get_header(session, url, timeout=timeout), retry, limiter=limiter)
+    if check_status(h.status, h.message):
+        return 0
+    return h.total_results
+
+
+def count(
+    target_word: str | None = None,
+    *,
+    year: int = 1950,
+    year_to: int | None = None,
+    field: str = "article",
+    timeout: float = 30.0,
+    session: requests.Session | None = None,
+    material: str | None = None,
+    author: str | None = None,
+    affil: str | None = None,
+    issn: str | None = None,
+    cdjournal: str | None = None,
+    rate_limiter: RateLimiter | None = None,
+    retry: RetryPolicy | None = None,
+) -> int | None:
+    """
+    Return the number of matching records (``totalResults``) without fetching them.
+
+    Sends a single ``count=1`` request and reads only the feed header, so no
+    entries are parsed and Polars is not needed. Search arguments are the same
+    as :func:`j_staget.fetch`. Returns 0 when the API reports no results
+    (ERR_001) and None when the response carries no ``totalResults``.
+    """
+    base_params = _build_params(
+        target_word,
+        year=year,
+        year_to=year_to,
+        field=field,
+        material=material,
+        author=author,
+        affil=affil,
+        issn=issn,
+        cdjournal=cdjournal,
+    )
+    owns_session = session is None
+    if owns_session:
+        session = requests.Session()
+    try:
+        return _probe_total(session, base_params, timeout=timeout, limiter=rate_limiter, retry=retry)
+    finally:
+        if owns_session:
+            session.close()
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+# <result><status> の値。ERR_001 は「該当なし」で、エラーではなく 0 件として扱う
+STATUS_NO_RESULTS = "ERR_001"
+
+
+class JStageAPIError(RuntimeError):
+    """Raised when J-STAGE API request fails or returns unexpected content."""
+
+
+class JStageResultError(JStageAPIError):
+    """Raised when the API answers with an ERR_xxx status in <result><status>."""
+
+    def __init__(self, code: str, message: str | None = None) -> None:
+        self.code = code
+        self.message = message
+        super().__init__(f"{code}: {message}" if message else code)
+
+
+class JStageQueryError(JStageResultError, ValueError):
+    """The API rejected the request parameters (e.g. ERR_012: no search condition)."""
+
+
+class JStageServerError(JStageResultError):
+    """The API reported an internal error (ERR_999)."""
+
+
+# ERR_xxx -> 例外クラス。メッセージ本文はレスポンスの <message> をそのまま使う。
+# コードは 1 つずつ書く（ここに無いコードは JStageResultError のまま。範囲でまとめて割り当てない）
+ERROR_CODES: dict[str, type[JStageResultError]] = {
+    "ERR_002": JStageQueryError,
+    "ERR_003": JStageQueryError,
+    "ERR_004": JStageQueryError,
+    "ERR_005": JStageQueryError,
+    "ERR_006": JStageQueryError,
+    "ERR_007": JStageQueryError,
+    "ERR_008": JStageQueryError,
+    "ERR_009": JStageQueryError,
+    "ERR_010": JStageQueryError,
+    "ERR_011": JStageQueryError,
+    "ERR_012": JStageQueryError,  # 検索条件が指定されていない
+    "ERR_999": JStageServerError,
+}
+
+
+def error_for(code: str, message: str | None = None) -> JStageResultError:
+    """status コードに対応する例外を作る（未知の ERR_xxx は JStageResultError）。"""
+    return ERROR_CODES.get(code, JStageResultError)(code, message)
+
+
+def check_status(status: str | None, message: str | None = None) -> bool:
+    """
+    ERR_001（条件不成立）なら True。
+    それ以外の ERR_xxx は種類ごとの例外にする。
+    """
+    if status == STATUS_NO_RESULTS:
+        return True
+    if status is not None and status.startswith("ERR_"):
+        raise error_for(status, message)
+    return False
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from xml.parsers import expat
+
+# フィードで使われる名前空間（このモジュールは標準ライブラリだけで読めるようにしておく）
+NS = {
+    "atom": "http://www.w3.org/2005/Atom",
+    "prism": "http://prismstandard.org/namespaces/basic/2.0/",
+    "opensearch": "http://a9.com/-/spec/opensearch/1.1/",
+    "xml": "http://www.w3.org/XML/1998/namespace",
+}
+
+
+@dataclass(frozen=True)
+class Header:
+    """フィード先頭（最初の entry より前）にある result/status・message と totalResults。"""
+
+    status: str | None = None
+    message: str | None = None
+    total_results: int | None = None
+
+    @property
+    def is_error(self) -> bool:
+        return self.status is not None and self.status.startswith("ERR_")
+
+
+class _HeaderDone(Exception):
+    pass
+
+
+_SEP = "}"
+_ENTRY = f"{NS['atom']}{_SEP}entry"
+_HEADER_TAGS = frozenset({"status", "message", "totalResults"})
+
+
+class HeaderProbe:
+    """
+    フィードのヘッダだけを読む expat パーサ。最初の entry の開始タグで止まるので、
+    1000 件のページでも本文はパースしない。done になったら以降の feed は無視する。
+    """
+
+    def __init__(self) -> None:
+        p = expat.ParserCreate(namespace_separator=_SEP)
+        p.buffer_text = True
+        p.StartElementHandler = self._start
+        p.EndElementHandler = self._end
+        p.CharacterDataHandler = self._chars
+        self._p = p
+        self._stack: list[str] = []
+        self._buf: list[str] = []
+        self._vals: dict[str, str] = {}
+        self.done = False
+
+    def feed(self, data: bytes) -> bool:
+        """data を読み、ヘッダを読み終えたら True を返す。"""
+        if not self.done:
+            try:
+                self._p.Parse(data, False)
+            except _HeaderDone:
+                self.done = True
+        return self.done
+
+    def close(self, strict: bool = False) -> Header:
+        """ヘッダを返す。strict なら、entry の前で XML が壊れていたら ExpatError を送出する。"""
+        if not self.done:
+            self.done = True
+            try:
+                self._p.Parse(b"", True)
+            except _HeaderDone:
+                pass
+            except expat.ExpatError:
+                # 既定では、壊れた XML は本文側のパーサがエラーにする
+                if strict:
+                    raise
+        total = self._vals.get("totalResults")
+        return Header(
+            status=self._vals.get("status"),
+            message=self._vals.get("message"),
+            total_results=int(total) if total else None,
+        )
+
+    def _start(self, name: str, attrs) -> None:
+        if name == _ENTRY:
+            raise _HeaderDone
+        self._stack.append(name[name.rfind(_SEP) + 1 :])
+        self._buf.clear()
+
+    def _chars(self, data: str) -> None:
+        if self._stack and self._stack[-1] in _HEADER_TAGS:
+            self._buf.append(data)
+
+    def _end(self, name: str) -> None:
+        local = self._stack.pop()
+        # status/message は <result> の直下のものだけ
+        in_place = local == "totalResults" or (self._stack and self._stack[-1] == "result")
+        if local in _HEADER_TAGS and local not in self._vals and in_place:
+            t = "".join(self._buf).strip()
+            if t:
+                self._vals[local] = t
+        self._buf.clear()
+
+
+def probe_header(content: bytes) -> Header:
+    """content のヘッダ部だけを読む。"""
+    probe = HeaderProbe()
+    probe.feed(content)
+    return probe.close()
@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import importlib.util
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Protocol
+from xml.parsers import expat
+
+from ._columns import COLUMNS, NS_FIELDS, PICK_TAGS, ColumnBuilder
+from ._header import _ENTRY, _SEP, NS, Header, HeaderProbe
+
+
+@dataclass(frozen=True)
+class PageInfo:
+    """1 ページ分のヘッダ情報と entry 数。"""
+
+    status: str | None
+    total_results: int | None
+    entries: int
+    message: str | None = None
+
+
+class PageParser(Protocol):
+    """
+    1 ページ分のレスポンスを受け取り、行を ColumnBuilder に積むパーサ。
+    feed() はバイト列を何回に分けて渡してもよい。close() でページ情報を返す。
+    header() は header_done が True になった後（または close 後）に呼ぶ。
+    """
+
+    header_done: bool
+
+    def feed(self, data: bytes) -> None: ...
+
+    def close(self) -> PageInfo: ...
+
+    def header(self) -> Header: ...
+
+
+class _BaseParser:
+    """HeaderProbe を前段に挟み、本文の処理はサブクラスの _feed/_close に任せる。"""
+
+    def __init__(self, rows: ColumnBuilder, max_rows: int) -> None:
+        self._rows = rows
+        self._max_rows = max_rows
+        self._probe = HeaderProbe()
+        self.header_done = False
+
+    def feed(self, data: bytes) -> None:
+        if not self.header_done:
+            self.header_done = self._probe.feed(data)
+        self._feed(data)
+
+    def close(self) -> PageInfo:
+        entries = self._close()
+        h = self.header()
+        return PageInfo(h.status, h.total_results, entries, h.message)
+
+    def header(self) -> Header:
+        return self._probe.close()
+
+    def _feed(self, data: bytes) -> None:
+        raise NotImplementedError
+
+    def _close(self) -> int:
+        raise NotImplementedError
+
+
+# (rows, max_rows) -> PageParser。rows が max_rows 件に達したら以降の entry は積まない
+ParserFactory = Callable[[ColumnBuilder, int], PageParser]
+
+
+# ---------------------------------------------------------------------------
+# lxml（木を作ってから抽出）
+# ---------------------------------------------------------------------------
+
+class LxmlTreeParser(_BaseParser):
+    """チャンクが届くたびに木を組み立てる（バイト列を溜めてから fromstring しない）。"""
+
+    def __init__(self, rows: ColumnBuilder, max_rows: int) -> None:
+        from lxml import etree
+
+        super().__init__(rows, max_rows)
+        self._p = etree.XMLParser()
+
+    def _feed(self, data: bytes) -> None:
+        self._p.feed(data)
+
+    def _close(self) -> int:
+        from ._xml import compiled, extract_values
+
+        root = self._p.close()
+
+        entries = compiled("//atom:entry")(root)
+        for entry in entries:
+            if len(self._rows) >= self._max_rows:
+                break
+            self._rows.append(extract_values(entry))
+        return len(entries)
+
+
+# ---------------------------------------------------------------------------
+# lxml iterparse（entry ごとにストリーミング）
+# ---------------------------------------------------------------------------
+
+class LxmlIterParser(_BaseParser):
+    def __init__(self, rows: ColumnBuilder, max_rows: int) -> None:
+        from ._xml import EntryStream, extract_values
+
+        super().__init__(rows, max_rows)
+        self._stream = EntryStream()
+        self._extract = extract_values
+        self._entries = 0
+
+    def _consume(self, entries) -> None:
+        for entry in entries:
+            self._entries += 1
+            if len(self._rows) < self._max_rows:
+                self._rows.append(self._extract(entry))
+
+    def _feed(self, data: bytes) -> None:
+        self._consume(self._stream.feed(data))
+
+    def _close(self) -> int:
+        self._consume(self._stream.close())
+        return self._entries
+
+
+# ---------------------------------------------------------------------------
+# expat（標準ライブラリのみ。要素木を作らずイベントから直接行を作る）
+# ---------------------------------------------------------------------------
+
+_IDX = {c: i for i, c in enumerate(COLUMNS)}
+_NS_FIELDS = {f"{NS[prefix]}{_SEP}{local}": _IDX[col] for (prefix, local), col in NS_FIELDS.items()}
+_PICK_TAGS = {t: _IDX[t] for t in PICK_TAGS}
+_AUTHOR = _IDX["author"]
+_CDVOLS = _IDX["cdvols"]
+
+# entry 直下の子の種類
+_K_OTHER, _K_NS, _K_PICK, _K_AUTHOR, _K_CDVOLS = range(5)
+
+
+class ExpatParser(_BaseParser):
+    """
+    SAX 的なイベントハンドラで extract_values と同じ行を作る。
+    テキストノード（開始/終了タグ・コメント・PI で区切られた文字列）を単位に、
+    その親要素と entry からの深さで振り分ける。
+    """
+
+    def __init__(self, rows: ColumnBuilder, max_rows: int) -> None:
+        super().__init__(rows, max_rows)
+
+        p = expat.ParserCreate(namespace_separator=_SEP)
+        p.buffer_text = True
+        p.StartElementHandler = self._start
+        p.EndElementHandler = self._end
+        p.CharacterDataHandler = self._buf_append
+        p.CommentHandler = self._boundary
+        p.ProcessingInstructionHandler = lambda target, data: self._boundary()
+        self._p = p
+
+        self._stack: list[str] = []  # 開いている要素の localname
+        self._buf: list[str] = []
+        self._fresh = False  # 直前が開始タグ（= 次のテキストは .text）
+        self._entries = 0
+
+        # entry 内の状態
+        self._entry_level = 0  # entry を開いたときの len(stack)。0 なら entry 外
+        self._kind = _K_OTHER
+        self._field = 0
+        self._pick = ""
+        self._sub = ""
+        self._subsub = ""
+
+    def _feed(self, data: bytes) -> None:
+        self._p.Parse(data, False)
+
+    def _close(self) -> int:
+        self._p.Parse(b"", True)
+        return self._entries
+
+    # --- expat handlers ---
+
+    def _buf_append(self, data: str) -> None:
+        self._buf.append(data)
+
+    def _flush(self) -> None:
+        if self._buf:
+            text = "".join(self._buf)
+            self._buf.clear()
+            self._text(text)
+
+    def _boundary(self, *_) -> None:
+        self._flush()
+        self._fresh = False
+
+    def _start(self, name: str, attrs) -> None:
+        self._flush()
+        local = name[name.rfind(_SEP) + 1 :]
+        self._stack.append(local)
+        self._fresh = True
+
+        if not self._entry_level:
+            if name == _ENTRY:
+                self._begin_entry()
+            return
+
+        rel = len(self._stack) - self._entry_level
+        if rel == 1:
+            self._sub = self._subsub = ""
+            i = _NS_FIELDS.get(name)
+            if i is not None:
+                self._kind, self._field = _K_NS, i
+            elif local in _PICK_TAGS:
+                self._kind, self._pick = _K_PICK, local
+            elif local == "author":
+                self._kind = _K_AUTHOR
+            elif local == "cdvols":
+                self._kind = _K_CDVOLS
+            else:
+                self._kind = _K_OTHER
+        elif rel == 2:
+            self._sub, self._subsub = local, ""
+        elif rel == 3:
+            self._subsub = local
+
+    def _end(self, name: str) -> None:
+        self._flush()
+        self._fresh = False
+        if self._entry_level:
+            rel = len(self._stack) - self._entry_level
+            if rel == 0:
+                self._end_entry()
+            elif rel == 1:
+                self._kind = _K_OTHER
+        self._stack.pop()
+
+    # --- entry ---
+
+    def _begin_entry(self) -> None:
+        self._entry_level = len(self._stack)
+        self._vals: list = [None] * len(COLUMNS)
+        self._ja: dict[str, str] = {}
+        self._any: dict[str, str] = {}
+        self._authors_ja: list[str] = []
+        self._authors_any: list[str] = []
+        self._cdvols_seen = False
+        self._kind = _K_OTHER
+
+    def _end_entry(self) -> None:
+        self._entry_level = 0
+        self._entries += 1
+        if len(self._rows) >= self._max_rows:
+            return
+        vals = self._vals
+        vals[_AUTHOR] = self._authors_ja or self._authors_any
+        for tag, i in _PICK_TAGS.items():
+            vals[i] = self._ja.get(tag) or self._any.get(tag)
+        self._rows.append(vals)
+
+    def _text(self, text: str) -> None:
+        kind = self._kind
+        if not self._entry_level or kind == _K_OTHER:
+            return
+        rel = len(self._stack) - self._entry_level
+
+        if kind == _K_NS:
+            if rel == 1 and self._fresh and self._vals[self._field] is None:
+                self._vals[self._field] = text
+        elif kind == _K_PICK:
+            pick = self._pick
+            if pick not in self._any:
+                t = text.strip()
+                if t:
+                    self._any[pick] = t
+            if rel == 2 and self._sub == "ja" and pick not in self._ja:
+                t = text.strip()
+                if t:
+                    self._ja[pick] = t
+        elif kind == _K_AUTHOR:
+            if rel == 2 and self._sub == "name":
+                t = text.strip()
+                if t:
+                    self._authors_any.append(t)
+            elif rel == 3 and self._sub == "ja" and self._subsub == "name":
+                t = text.strip()
+                if t:
+                    self._authors_ja.append(t)
+        elif kind == _K_CDVOLS and rel == 1 and not self._cdvols_seen:
+            self._vals[_CDVOLS] = text.strip()
+            self._cdvols_seen = True
+
+
+# ---------------------------------------------------------------------------
+# registry
+# ---------------------------------------------------------------------------
+
+PARSERS: dict[str, ParserFactory] = {
+    "lxml": LxmlTreeParser,
+    "iterparse": LxmlIterParser,
+    "expat": ExpatParser,
+}
+
+
+def has_lxml() -> bool:
+    return importlib.util.find_spec("lxml") is not None
+
+
+# どのバックエンドでも、壊れた XML で送出されうる例外（lxml の XMLSyntaxError は SyntaxError の派生）
+PARSE_ERRORS = (SyntaxError, ValueError, expat.ExpatError)
+
+# lxml が無いと使えないバックエンド
+LXML_PARSERS = frozenset({"lxml", "iterparse"})
+
+
+def resolve_parser(name: str) -> ParserFactory:
+    """
+    parser 名からファクトリを返す。"auto" は lxml があれば lxml、無ければ expat
+    （benchmarks/bench_parsers.py では lxml の木を作ってから取り出すのが最も速い）。
+    不正な名前は ValueError、lxml が無いのに lxml のバックエンドを名指ししたら ImportError。
+    """
+    if name == "auto":
+        name = "lxml" if has_lxml() else "expat"
+    try:
+        factory = PARSERS[name]
+    except KeyError:
+        raise ValueError(f"parser must be one of {sorted(['auto', *PARSERS])}") from None
+    if name in LXML_PARSERS and not has_lxml():
+        raise ImportError(f"parser={name!r} requires lxml: pip install lxml (or use parser='expat')")
+    return factory
+
+
+def parse_page(content: bytes, rows: ColumnBuilder, max_rows: int, parser: str = "auto") -> PageInfo:
+    """content 全体を 1 ページとしてパースし、行を rows に積む。"""
+    p = resolve_parser(parser)(rows, max_rows)
+    p.feed(content)
+    return p.close()
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import urllib.parse
+from dataclasses import dataclass
+
+API_URL = "https://api.jstage.jst.go.jp/searchapi/do"
+
+# target_word を入れる先（従来互換）
+ALLOWED_FIELDS = {"article", "abst", "text", "keyword"}
+
+# service=3 で「検索語として成立する」代表的パラメータ（ERR_012回避用）
+SEARCH_PARAM_KEYS = {
+    "material",
+    "article",
+    "author",
+    "affil",
+    "keyword",
+    "abst",
+    "text",
+    "issn",
+    "cdjournal",  # ここが公式
+}
+
+
+def _q(s: str) -> str:
+    return urllib.parse.quote(s, safe="")
+
+
+def _build_params(
+    target_word: str | None,
+    *,
+    year: int,
+    year_to: int | None,
+    field: str,
+    material: str | None,
+    author: str | None,
+    affil: str | None,
+    issn: str | None,
+    cdjournal: str | None,
+) -> dict[str, str]:
+    """検索条件（start/count 以外）のクエリパラメータを組み立てる。"""
+    if field not in ALLOWED_FIELDS:
+        raise ValueError(f"field must be one of {sorted(ALLOWED_FIELDS)}")
+
+    base_params: dict[str, str] = {
+        "service": "3",
+        "pubyearfrom": str(int(year)),
+    }
+    if year_to is not None:
+        if year_to < year:
+            raise ValueError("year_to must be >= year")
+        base_params["pubyearto"] = str(int(year_to))
+
+    # 既存互換: target_word + field
+    if target_word is not None and target_word.strip():
+        base_params[field] = target_word.strip()
+
+    # 追加条件
+    if material:
+        base_params["material"] = material
+    if author:
+        base_params["author"] = author
+    if affil:
+        base_params["affil"] = affil
+    if issn:
+        base_params["issn"] = issn
+    if cdjournal:
+        base_params["cdjournal"] = cdjournal
+
+    # 「検索語が何もない」状態を弾く（yearだけ等）
+    if not any(k in base_params for k in SEARCH_PARAM_KEYS):
+        raise ValueError(
+            "At least one search parameter must be provided: "
+            "target_word (with field), material, author, affil, issn, or cdjournal."
+        )
+    return base_params
+
+
+def _page_url(base_params: dict[str, str], start: int, count: int) -> str:
+    params = dict(base_params)
+    params["start"] = str(start)
+    params["count"] = str(int(count))
+    query_str = "&".join(f"{k}={_q(v)}" for k, v in params.items())
+    return f"{API_URL}?{query_str}"
+
+
+def plan_pages(start: int, stop: int, step: int) -> list[tuple[int, int]]:
+    """
+    レコード番号 start..stop（両端を含む、1 始まり）を取るための (start, count) の並び。
+    最後の窓は残り件数ちょうどにするので、捨てるための entry は要求しない。
+    """
+    return [(s, min(step, stop - s + 1)) for s in range(start, stop + 1, step)]
+
+
+@dataclass
+class PagePlan:
+    """
+    1 回の取得でどのページをどの順に取るかの計画（fetch と afetch で共通）。
+    totalResults が分かるまでは next_page() の 1 ページずつ取り、record() で結果を渡す。
+    分かったら残りは windows() の窓どおりに（並行に取ってよい）取る。
+    どのページも max_records を超える件数は要求しない。
+    """
+
+    max_records: int
+    step: int
+    start: int = 1
+    fetched: int = 0  # 取得済み件数
+    total_results: int | None = None
+    done: bool = False
+
+    def next_page(self) -> tuple[int, int] | None:
+        """逐次に取る次のページの (start, count)。逐次の段階が終わっていれば None。"""
+        if self.done or self.total_results is not None or self.fetched >= self.max_records:
+            return None
+        return self.start, min(self.step, self.max_records - self.fetched)
+
+    def record(self, count: int, total_results: int | None, rows: int) -> None:
+        """next_page() のページを取った結果（ERR_001 以外）を反映する。"""
+        # totalResults は「最初に取れた値」を固定する
+        self.total_results = total_results
+        # データが増えなかった（異常系）
+        if not rows:
+            self.done = True
+            return
+        self.fetched += rows
+        self.start += count
+        # totalResults が無いときは、要求より少ないページを最後とみなす（空ページをもう 1 回取りに行かない）
+        if total_results is None and rows < count:
+            self.done = True
+
+    def windows(self) -> list[tuple[int, int]]:
+        """totalResults が分かった後に残りを取る (start, count) の窓。"""
+        if self.done or self.total_results is None or self.fetched >= self.max_records:
+            return []
+        stop = min(self.total_results, self.start + (self.max_records - self.fetched) - 1)
+        return plan_pages(self.start, stop, self.step)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import polars as pl
+import requests
+
+from ._columns import ColumnBuilder
+from ._count import _probe_total
+from ._query import _build_params
+from .cache import PageCache, ResponseCache
+from .client import DEFAULT_STEP, FetchResult, _pooled_session, _validate, fetch
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+
+DEFAULT_SHARD_SIZE = 20000
+
+
+@dataclass(frozen=True)
+class Shard:
+    """pubyear が year..year_to（両端を含む）の範囲と、その件数。"""
+
+    year: int
+    year_to: int
+    total: int | None
+
+
+def _plan_shards(probe, year: int, year_to: int, shard_size: int) -> list[Shard]:
+    """
+    年の範囲を、件数が shard_size 以下になるまで二分する（年の昇順に返す）。
+    probe(year, year_to) は件数を返す。範囲は重ならないので、右半分の件数は
+    全体から左半分を引いて求め、probe は分割 1 回につき 1 回で済ませる。
+    1 年だけの範囲はそれ以上分けられないので、大きくてもそのまま 1 シャードにする。
+    """
+    shards: list[Shard] = []
+
+    def split(lo: int, hi: int, n: int | None) -> None:
+        if n == 0:
+            return
+        if lo == hi or (n is not None and n <= shard_size):
+            shards.append(Shard(lo, hi, n))
+            return
+        mid = (lo + hi) // 2
+        left = probe(lo, mid)
+        right = probe(mid + 1, hi) if n is None or left is None else max(n - left, 0)
+        split(lo, mid, left)
+        split(mid + 1, hi, right)
+
+    split(year, year_to, probe(year, year_to))
+    return shards
+
+
+def _dedupe(df: pl.DataFrame) -> pl.DataFrame:
+    """doi（無ければ article_link）が同じ行は最初の 1 行だけ残す。どちらも無い行は残す。"""
+    key = pl.coalesce("doi", "article_link")
+    return df.filter(key.is_null() | key.is_first_distinct())
+
+
+def fetch_sharded(
+    target_word: str | None = None,
+    *,
+    year: int = 1950,
+    year_to: int | None = None,
+    field: str = "article",
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    sleep: float = 5.0,
+    step: int = DEFAULT_STEP,
+    timeout: float = 30.0,
+    session: requests.Session | None = None,
+    material: str | None = None,
+    author: str | None = None,
+    affil: str | None = None,
+    issn: str | None = None,
+    cdjournal: str | None = None,
+    parser: str = "auto",
+    stream: bool = False,
+    workers: int = 4,
+    rate_limiter: RateLimiter | None = None,
+    retry: RetryPolicy | None = None,
+    cache: ResponseCache | None = None,
+    page_cache: PageCache | None = None,
+) -> FetchResult:
+    """
+    Fetch every record of a large query by splitting it into publication-year shards.
+
+    The range ``year..year_to`` (``year_to`` defaults to the current year) is
+    halved recursively, using :func:`j_staget.count`-style probes, until each
+    shard reports at most ``shard_size`` records; a single year that is still
+    larger is fetched as one shard. Shards are fetched in full on ``workers``
+    threads that share one connection pool and one rate limiter (probes
+    included), then concatenated in year order and deduplicated by ``doi``
+    (falling back to ``article_link``).
+
+    ``total_results`` is the sum of the shard counts. Other arguments are the
+    same as :func:`j_staget.fetch`.
+    """
+    if shard_size <= 0:
+        raise ValueError("shard_size must be > 0")
+    if workers <= 0:
+        raise ValueError("workers must be > 0")
+    _validate(max_records=shard_size, step=step, parser=parser)
+    if year_to is None:
+        year_to = max(year, datetime.date.today().year)
+    query = {
+        "field": field,
+        "material": material,
+        "author": author,
+        "affil": affil,
+        "issn": issn,
+        "cdjournal": cdjournal,
+    }
+    _build_params(target_word, year=year, year_to=year_to, **query)  # 不正な条件はここで ValueError
+    limiter = rate_limiter if rate_limiter is not None else RateLimiter.from_interval(sleep)
+
+    owns_session = session is None
+    if owns_session:
+        session = _pooled_session(workers)
+    try:
+
+        def probe(lo: int, hi: int) -> int | None:
+            params = _build_params(target_word, year=lo, year_to=hi, **query)
+            return _probe_total(session, params, timeout=timeout, limiter=limiter, retry=retry)
+
+        shards = _plan_shards(probe, year, year_to, shard_size)
+
+        def get(shard: Shard) -> FetchResult:
+            return fetch(
+                target_word,
+                year=shard.year,
+                year_to=shard.year_to,
+                # 件数が分からないシャードは shard_size 件まで
+                max_records=shard.total if shard.total is not None else shard_size,
+                step=step,
+                timeout=timeout,
+                session=session,
+                parser=parser,
+                stream=stream,
+                rate_limiter=limiter,
+                retry=retry,
+                cache=cache,
+                page_cache=page_cache,
+                **query,
+            )
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(get, shards))
+    finally:
+        if owns_session:
+            session.close()
+
+    frames = [r.df for r in results if r.df.height]
+    df = _dedupe(pl.concat(frames)) if frames else ColumnBuilder().to_frame()
+    total = sum(r.total_results or 0 for r in results)
+    return FetchResult(df=df, total_results=total)
@@ -1,24 +1,83 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
+
 from lxml import etree
 
-NS = {
-    "atom": "http://www.w3.org/2005/Atom",
-    "prism": "http://prismstandard.org/namespaces/basic/2.0/",
-    "opensearch": "http://a9.com/-/spec/opensearch/1.1/",
-    "xml": "http://www.w3.org/XML/1998/namespace",
-}
+from ._columns import COLUMNS, NS_FIELDS, PICK_TAGS
+from ._header import NS
+
+# XPath はコンパイル済みのものを使い回す（entry ごとの再コンパイルを避ける）
+_XPATHS: dict[str, etree.XPath] = {}
+
+
+def compiled(xpath_query: str | etree.XPath) -> etree.XPath:
+    """xpath_query に対応するコンパイル済み XPath（NS 束縛済み）を返す。"""
+    if isinstance(xpath_query, etree.XPath):
+        return xpath_query
+    xp = _XPATHS.get(xpath_query)
+    if xp is None:
+        xp = _XPATHS[xpath_query] = etree.XPath(xpath_query, namespaces=NS)
+    return xp
+
+
+def _ja_text_query(tag: str) -> str:
+    return f"./*[local-name()='{tag}']/*[local-name()='ja']/text()"
+
+
+def _any_text_query(tag: str) -> str:
+    return f"./*[local-name()='{tag}']//text()"
+
+
+# tag -> (ja 優先の式, 全テキストの式)
+_TAG_XPATHS: dict[str, tuple[etree.XPath, etree.XPath]] = {}
+
 
-def get_texts(entry: etree._Element, xpath_query: str) -> list[str]:
-    nodes = entry.xpath(xpath_query, namespaces=NS)
+def _tag_xpaths(tag: str) -> tuple[etree.XPath, etree.XPath]:
+    xps = _TAG_XPATHS.get(tag)
+    if xps is None:
+        xps = _TAG_XPATHS[tag] = (compiled(_ja_text_query(tag)), compiled(_any_text_query(tag)))
+    return xps
+
+
+AUTHORS_JA = "./*[local-name()='author']/*[local-name()='ja']/*[local-name()='name']/text()"
+AUTHORS_ANY = "./*[local-name()='author']/*[local-name()='name']/text()"
+CDVOLS = "./*[local-name()='cdvols']/text()"
+
+# row_xpath が使う式は import 時にまとめてコンパイルしておく。
+# fetch は entry を子要素の 1 回の走査（extract_values/extract_row）で読むので、ここで使うのは
+# lxml バックエンドが entry を列挙する //atom:entry だけ。残りはテストとベンチマーク用の参照実装の分。
+for _q in (
+    "//atom:entry",
+    "atom:cdjournal",
+    "atom:pubyear",
+    "prism:issn",
+    "prism:eIssn",
+    "prism:doi",
+    "prism:volume",
+    "prism:number",
+    "prism:startingPage",
+    "prism:endingPage",
+    CDVOLS,
+    AUTHORS_JA,
+    AUTHORS_ANY,
+):
+    compiled(_q)
+for _q in ("article_title", "material_title", "article_link"):
+    _tag_xpaths(_q)
+del _q
+
+
+def get_texts(entry: etree._Element, xpath_query: str | etree.XPath) -> list[str]:
+    nodes = compiled(xpath_query)(entry)
     return [n.text for n in nodes if getattr(n, "text", None)]
 
-def get_first(entry: etree._Element, xpath_query: str):
+def get_first(entry: etree._Element, xpath_query: str | etree.XPath):
     vals = get_texts(entry, xpath_query)
     return vals[0] if vals else None
 
-def texts_local(entry: etree._Element, xpath_expr: str) -> list[str]:
-    vals = entry.xpath(xpath_expr)
+def texts_local(entry: etree._Element, xpath_expr: str | etree.XPath) -> list[str]:
+    vals = compiled(xpath_expr)(entry)
     out: list[str] = []
     for v in vals:
         if isinstance(v, str):
@@ -31,19 +90,166 @@ def texts_local(entry: etree._Element, xpath_expr: str) -> list[str]:
                 out.append(t.strip())
     return out
 
-def first_local(entry: etree._Element, xpath_expr: str):
+def first_local(entry: etree._Element, xpath_expr: str | etree.XPath):
     vals = texts_local(entry, xpath_expr)
     return vals[0] if vals else None
 
 def pick_ja_or_first_tag_local(entry: etree._Element, tag: str) -> str | None:
-    ja = first_local(entry, f"./*[local-name()='{tag}']/*[local-name()='ja']/text()")
+    ja_xp, any_xp = _tag_xpaths(tag)
+    ja = first_local(entry, ja_xp)
     if ja:
         return ja
-    any_text = first_local(entry, f"./*[local-name()='{tag}']//text()")
+    any_text = first_local(entry, any_xp)
     return any_text
 
 def authors_local(entry: etree._Element) -> list[str]:
-    ja = texts_local(entry, "./*[local-name()='author']/*[local-name()='ja']/*[local-name()='name']/text()")
+    ja = texts_local(entry, AUTHORS_JA)
     if ja:
         return ja
-    return texts_local(entry, "./*[local-name()='author']/*[local-name()='name']/text()")
+    return texts_local(entry, AUTHORS_ANY)
+
+def row_xpath(entry: etree._Element) -> dict:
+    """列ごとに XPath を評価して 1 行を作る（抽出ルールの基準実装）。"""
+    cdvols = compiled(CDVOLS)(entry)
+    return {
+        "author": authors_local(entry),
+        "article_title": pick_ja_or_first_tag_local(entry, "article_title"),
+        "material_title": pick_ja_or_first_tag_local(entry, "material_title"),
+        "cdjournal": get_first(entry, "atom:cdjournal"),
+        "p_issn": get_first(entry, "prism:issn"),
+        "o_issn": get_first(entry, "prism:eIssn"),
+        "article_link": pick_ja_or_first_tag_local(entry, "article_link"),
+        "pubyear": get_first(entry, "atom:pubyear"),
+        "doi": get_first(entry, "prism:doi"),
+        "volume": get_first(entry, "prism:volume"),
+        "cdvols": cdvols[0].strip() if cdvols else None,
+        "number": get_first(entry, "prism:number"),
+        "starting_page": get_first(entry, "prism:startingPage"),
+        "ending_page": get_first(entry, "prism:endingPage"),
+    }
+
+
+_IDX = {c: i for i, c in enumerate(COLUMNS)}
+
+_NS_FIELDS = {f"{{{NS[prefix]}}}{local}": _IDX[col] for (prefix, local), col in NS_FIELDS.items()}
+_PICK_TAGS = {t: _IDX[t] for t in PICK_TAGS}
+_AUTHOR = _IDX["author"]
+_CDVOLS = _IDX["cdvols"]
+
+
+def _local(tag: str) -> str:
+    return tag[tag.rfind("}") + 1 :]
+
+
+def _text_nodes(el: etree._Element) -> Iterator[str]:
+    """XPath の ./text() と同じ順でテキストノードを返す。"""
+    if el.text is not None:
+        yield el.text
+    for c in el:
+        if c.tail is not None:
+            yield c.tail
+
+
+def _first_nonblank(texts) -> str | None:
+    for t in texts:
+        t = t.strip()
+        if t:
+            return t
+    return None
+
+
+def extract_values(entry: etree._Element) -> list:
+    """
+    entry の直下の子を 1 回だけ走査して、COLUMNS 順の値リストを作る。
+    結果は row_xpath と同じ（ja 優先ルール・author のフォールバックも含む）。
+    """
+    vals: list = [None] * len(COLUMNS)
+    ja: dict[str, str] = {}
+    any_text: dict[str, str] = {}
+    authors_ja: list[str] = []
+    authors_any: list[str] = []
+    cdvols_seen = False
+
+    for child in entry:
+        tag = child.tag
+        if not isinstance(tag, str):
+            continue
+
+        i = _NS_FIELDS.get(tag)
+        if i is not None:
+            if vals[i] is None and child.text:
+                vals[i] = child.text
+            continue
+
+        local = _local(tag)
+        if local in _PICK_TAGS:
+            if local not in ja:
+                for sub in child:
+                    if isinstance(sub.tag, str) and _local(sub.tag) == "ja":
+                        t = _first_nonblank(_text_nodes(sub))
+                        if t:
+                            ja[local] = t
+                            break
+            if local not in any_text:
+                t = _first_nonblank(child.itertext())
+                if t:
+                    any_text[local] = t
+        elif local == "author":
+            for sub in child:
+                if not isinstance(sub.tag, str):
+                    continue
+                sub_local = _local(sub.tag)
+                if sub_local == "ja":
+                    for name in sub:
+                        if isinstance(name.tag, str) and _local(name.tag) == "name":
+                            authors_ja.extend(t for t in (x.strip() for x in _text_nodes(name)) if t)
+                elif sub_local == "name":
+                    authors_any.extend(t for t in (x.strip() for x in _text_nodes(sub)) if t)
+        elif local == "cdvols" and not cdvols_seen:
+            for t in _text_nodes(child):
+                vals[_CDVOLS] = t.strip()
+                cdvols_seen = True
+                break
+
+    vals[_AUTHOR] = authors_ja or authors_any
+    for tag, i in _PICK_TAGS.items():
+        vals[i] = ja.get(tag) or any_text.get(tag)
+    return vals
+
+
+def extract_row(entry: etree._Element) -> dict:
+    """extract_values の結果を {列名: 値} にしたもの。"""
+    return dict(zip(COLUMNS, extract_values(entry)))
+
+
+ATOM_ENTRY = f"{{{NS['atom']}}}entry"
+
+
+class EntryStream:
+    """
+    iterparse 相当のストリーミングパーサ。
+    atom:entry が閉じた時点で yield し、処理済みの entry と先行する兄弟要素は消していく。
+    （ヘッダの status/totalResults は _header.HeaderProbe が読む）
+    """
+
+    def __init__(self) -> None:
+        # entry 内の要素のイベントは不要なので entry だけに絞る
+        self._parser = etree.XMLPullParser(events=("end",), tag=ATOM_ENTRY)
+
+    def feed(self, data: bytes) -> Iterator[etree._Element]:
+        self._parser.feed(data)
+        yield from self._drain()
+
+    def close(self) -> Iterator[etree._Element]:
+        self._parser.close()
+        yield from self._drain()
+
+    def _drain(self) -> Iterator[etree._Element]:
+        for _, el in self._parser.read_events():
+            yield el
+            # 処理済み entry と、その前に残っている兄弟（ヘッダ要素など）を解放
+            el.clear(keep_tail=True)
+            parent = el.getparent()
+            if parent is not None:
+                while el.getprevious() is not None:
+                    del parent[0]
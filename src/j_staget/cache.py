@@ -0,0 +1,415 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.parse
+import zlib
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from ._filelock import locked
+
+if TYPE_CHECKING:
+    import polars as pl
+
+    from ._parsers import PageInfo
+
+_SUFFIX = ".page"
+_LOCK = ".lock"
+
+
+def canonical_url(url: str) -> str:
+    """
+    キャッシュのキーにする URL。scheme/host を小文字にし、クエリを名前順に並べ直す
+    （start/count も含めてパラメータの順番が違うだけの URL は同じキーになる）。
+    """
+    parts = urllib.parse.urlsplit(url)
+    query = sorted(urllib.parse.parse_qsl(parts.query, keep_blank_values=True))
+    return urllib.parse.urlunsplit(
+        (
+            parts.scheme.lower(),
+            parts.netloc.lower(),
+            parts.path,
+            urllib.parse.urlencode(query, quote_via=urllib.parse.quote),
+            "",
+        )
+    )
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """キャッシュされた 1 レスポンス。stored_at は保存した時刻（time.time()）。"""
+
+    url: str
+    body: bytes
+    stored_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class ResponseCache:
+    """
+    On-disk cache of raw API responses, shared safely between threads and processes.
+
+    Entries are keyed by the canonicalised request URL (including ``start`` and
+    ``count``) and stored zlib-compressed, one file per response. An entry is
+    served for ``ttl`` seconds after it was stored (``None``: forever); after
+    that it is revalidated with ``If-None-Match``/``If-Modified-Since`` and
+    reused if the server answers 304 Not Modified. When
+    the directory grows beyond ``max_bytes``, the least recently used entries
+    are removed. Writes are atomic and the total size is kept up to date in
+    the lock file, so a write does not scan the directory unless the cache is
+    over ``max_bytes``. Several processes may use the same directory.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        *,
+        ttl: float | None = 24 * 60 * 60,
+        max_bytes: int | None = 1 << 30,
+        level: int = 6,
+    ) -> None:
+        if ttl is not None and ttl < 0:
+            raise ValueError("ttl must be >= 0 or None")
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("max_bytes must be > 0 or None")
+        self.dir = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.level = level
+
+    def _path(self, key: str) -> Path:
+        return self.dir / (hashlib.sha256(key.encode("utf-8")).hexdigest() + _SUFFIX)
+
+    def lookup(self, url: str) -> CachedResponse | None:
+        """url の保存済みレスポンスを返す（期限切れでも返す）。無い・壊れていれば None。"""
+        key = canonical_url(url)
+        path = self._path(key)
+        try:
+            with path.open("rb") as f:
+                meta = json.loads(f.readline())
+                body = zlib.decompress(f.read())
+        except (OSError, ValueError, zlib.error):
+            return None
+        if meta.get("url") != key:
+            return None
+        try:
+            os.utime(path)  # LRU 用に最終利用時刻を更新する
+        except OSError:
+            pass
+        return CachedResponse(key, body, meta["stored_at"], meta.get("etag"), meta.get("last_modified"))
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return self.ttl is None or time.time() - entry.stored_at < self.ttl
+
+    def get(self, url: str) -> bytes | None:
+        """期限内のレスポンス本文を返す。無ければ None。"""
+        entry = self.lookup(url)
+        return entry.body if entry is not None and self.is_fresh(entry) else None
+
+    def put(self, url: str, body: bytes, headers: Mapping[str, str] | None = None) -> None:
+        """レスポンス本文（と ETag/Last-Modified）を保存する。"""
+        key = canonical_url(url)
+        headers = headers or {}
+        meta = {
+            "url": key,
+            "stored_at": time.time(),
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+        }
+        data = json.dumps(meta).encode("utf-8") + b"\n" + zlib.compress(body, self.level)
+
+        self.dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{time.monotonic_ns()}.tmp")
+        tmp.write_bytes(data)
+        # 置き換えと合計バイト数の更新はロックの中で行う（ディレクトリ全体は見ない）
+        with locked(self.dir / _LOCK) as fd:
+            try:
+                old = path.stat().st_size
+            except FileNotFoundError:
+                old = 0
+            os.replace(tmp, path)
+            total = _read_total(fd)
+            total = self.size() if total is None else total + len(data) - old
+            if self.max_bytes is not None and total > self.max_bytes:
+                total = self._evict()
+            _write_total(fd, total)
+
+    def refresh(self, entry: CachedResponse, headers: Mapping[str, str] | None = None) -> None:
+        """304 で有効と分かった entry を、保存時刻（と新しい ETag/Last-Modified）を更新して保存し直す。"""
+        headers = headers or {}
+        self.put(
+            entry.url,
+            entry.body,
+            {
+                "ETag": headers.get("ETag") or entry.etag,
+                "Last-Modified": headers.get("Last-Modified") or entry.last_modified,
+            },
+        )
+
+    def clear(self) -> None:
+        """保存済みのレスポンスを全部消す。"""
+        with locked(self.dir / _LOCK) as fd:
+            for p in self.dir.glob("*" + _SUFFIX):
+                p.unlink(missing_ok=True)
+            _write_total(fd, 0)
+
+    def size(self) -> int:
+        """保存済みレスポンスの合計バイト数。"""
+        return sum(size for _, _, size in self._entries())
+
+    def _entries(self) -> list[tuple[float, Path, int]]:
+        out = []
+        for p in self.dir.glob("*" + _SUFFIX):
+            try:
+                st = p.stat()
+            except FileNotFoundError:  # 他のプロセスが消した
+                continue
+            out.append((st.st_mtime, p, st.st_size))
+        return out
+
+    def _evict(self) -> int:
+        """
+        記録上の合計が max_bytes を超えたときだけ呼ぶ（ロックの中で）。ディレクトリを数え直し、
+        本当に超えていれば最後に使われたのが古いものから消す。残った合計バイト数を返す。
+        """
+        entries = self._entries()
+        total = sum(size for _, _, size in entries)
+        if total <= self.max_bytes:
+            return total
+        for _, p, size in sorted(entries, key=lambda e: e[0]):
+            p.unlink(missing_ok=True)
+            total -= size
+            if total <= self.max_bytes:
+                break
+        return total
+
+
+def _read_total(fd: int) -> int | None:
+    """ロックファイルに記録した合計バイト数。まだ無い・壊れていれば None。"""
+    os.lseek(fd, 0, os.SEEK_SET)
+    try:
+        return int(os.read(fd, 32).decode("ascii"))
+    except ValueError:
+        return None
+
+
+def _write_total(fd: int, total: int) -> None:
+    os.ftruncate(fd, 0)
+    os.lseek(fd, 0, os.SEEK_SET)
+    os.write(fd, str(total).encode("ascii"))
+
+
+def conditional_headers(etag: str | None, last_modified: str | None) -> dict[str, str]:
+    """保存済みの ETag/Last-Modified から条件付きリクエストのヘッダを作る。"""
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    """PageCache の 1 エントリ。size は df.estimated_size()。"""
+
+    page: PageInfo
+    df: pl.DataFrame
+    size: int
+    stored_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+@dataclass(frozen=True)
+class PageCacheInfo:
+    hits: int
+    misses: int
+    revalidated: int
+    entries: int
+    bytes: int
+    max_bytes: int
+
+
+class PageCache:
+    """
+    In-process LRU cache of parsed pages, bounded by their size in bytes.
+
+    Maps a page request (query, ``start`` and ``count``, via the canonical URL)
+    to its parsed, typed DataFrame, so a repeated or overlapping fetch in the
+    same process skips both the request and the XML parse. The size of a page
+    is ``DataFrame.estimated_size()``; least recently used pages are dropped
+    once the total exceeds ``max_bytes``. With a ``ttl``, older pages are
+    revalidated with the server (ETag/Last-Modified) and reused on 304.
+    ``info()`` reports hits, misses and revalidations. Safe to share between threads.
+    """
+
+    def __init__(self, max_bytes: int = 256 << 20, *, ttl: float | None = None) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be > 0")
+        if ttl is not None and ttl < 0:
+            raise ValueError("ttl must be >= 0 or None")
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._pages: OrderedDict[str, CachedPage] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def is_fresh(self, entry: CachedPage) -> bool:
+        return self.ttl is None or time.time() - entry.stored_at < self.ttl
+
+    def lookup(self, url: str) -> CachedPage | None:
+        """
+        url のエントリを返す（期限切れでも返す）。期限内なら hit、
+        無いか期限切れなら miss として数える。
+        """
+        key = canonical_url(url)
+        with self._lock:
+            entry = self._pages.get(key)
+            if entry is not None:
+                self._pages.move_to_end(key)
+            if entry is not None and self.is_fresh(entry):
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry
+
+    def get(self, url: str) -> tuple[PageInfo, pl.DataFrame] | None:
+        """期限内のページを返す。無ければ None。"""
+        entry = self.lookup(url)
+        if entry is None or not self.is_fresh(entry):
+            return None
+        return entry.page, entry.df
+
+    def put(self, url: str, page: PageInfo, df: pl.DataFrame, headers: Mapping[str, str] | None = None) -> None:
+        headers = headers or {}
+        entry = CachedPage(
+            page, df, df.estimated_size(), time.time(), headers.get("ETag"), headers.get("Last-Modified")
+        )
+        if entry.size > self.max_bytes:
+            return  # 1 ページで上限を超えるものは持たない
+        self._store(canonical_url(url), entry)
+
+    def refresh(self, url: str, entry: CachedPage, headers: Mapping[str, str] | None = None) -> None:
+        """304 で有効と分かった entry の保存時刻（と新しい ETag/Last-Modified）を更新する。"""
+        headers = headers or {}
+        entry = replace(
+            entry,
+            stored_at=time.time(),
+            etag=headers.get("ETag") or entry.etag,
+            last_modified=headers.get("Last-Modified") or entry.last_modified,
+        )
+        with self._lock:
+            self.revalidated += 1
+        self._store(canonical_url(url), entry)
+
+    def _store(self, key: str, entry: CachedPage) -> None:
+        with self._lock:
+            old = self._pages.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._pages[key] = entry
+            self._bytes += entry.size
+            while self._bytes > self.max_bytes:
+                _, dropped = self._pages.popitem(last=False)
+                self._bytes -= dropped.size
+
+    def clear(self) -> None:
+        """ページとカウンタを消す。"""
+        with self._lock:
+            self._pages.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.revalidated = 0
+
+    def info(self) -> PageCacheInfo:
+        with self._lock:
+            return PageCacheInfo(
+                self.hits, self.misses, self.revalidated, len(self._pages), self._bytes, self.max_bytes
+            )
+
+
+class ResultCache:
+    """
+    Parquet cache of whole :func:`j_staget.fetch` results.
+
+    A result is stored under a fingerprint of the query parameters and
+    ``max_records`` (see :meth:`key`) as ``<key>.parquet`` plus a small
+    ``<key>.json`` with the query and ``total_results``. A hit is read back with
+    a memory-mapped Parquet read, without any request or XML parse. Entries
+    older than ``max_age`` seconds are ignored (``None``: never expire);
+    :meth:`invalidate` removes one entry or all of them.
+    """
+
+    def __init__(self, directory: str | os.PathLike, *, max_age: float | None = None) -> None:
+        if max_age is not None and max_age < 0:
+            raise ValueError("max_age must be >= 0 or None")
+        self.dir = Path(directory)
+        self.max_age = max_age
+
+    @staticmethod
+    def key(params: Mapping[str, str], max_records: int) -> str:
+        """検索条件（start/count 以外）と max_records の指紋。"""
+        doc = json.dumps({"params": dict(params), "max_records": int(max_records)}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(doc.encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        return self.dir / f"{key}.parquet", self.dir / f"{key}.json"
+
+    def get(self, key: str):
+        """保存済みの FetchResult を返す。無い・古い・壊れていれば None。"""
+        import polars as pl
+
+        from .client import FetchResult
+
+        data, meta_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if self.max_age is not None and time.time() - meta["stored_at"] >= self.max_age:
+            return None
+        try:
+            df = pl.read_parquet(data, memory_map=True)
+        except (OSError, pl.exceptions.PolarsError):  # 消えた・書きかけのファイルは「無い」ものとして扱う
+            return None
+        return FetchResult(df=df, total_results=meta["total_results"])
+
+    def put(self, key: str, result, params: Mapping[str, str] | None = None) -> None:
+        """FetchResult を保存する（データを書いてからメタデータを差し替える）。"""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        data, meta_path = self._paths(key)
+        suffix = f".{os.getpid()}.{time.monotonic_ns()}.tmp"
+        tmp = data.with_name(data.name + suffix)
+        result.df.write_parquet(tmp)
+        os.replace(tmp, data)
+        meta = {
+            "params": dict(params) if params is not None else None,
+            "total_results": result.total_results,
+            "rows": result.df.height,
+            "stored_at": time.time(),
+        }
+        tmp = meta_path.with_name(meta_path.name + suffix)
+        tmp.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, meta_path)
+
+    def invalidate(self, key: str | None = None) -> None:
+        """key の結果を消す。key が None なら全部消す。"""
+        keys = [key] if key is not None else [p.stem for p in self.dir.glob("*.json")]
+        for k in keys:
+            for p in self._paths(k):
+                p.unlink(missing_ok=True)
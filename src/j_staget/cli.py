@@ -1,53 +1,339 @@
 from __future__ import annotations
 
 import argparse
+import importlib.util
+import os
+import sys
 from pathlib import Path
 
-import polars as pl  # ← これを追加
+from ._count import count
+from .cache import ResponseCache
+from .retry import RetryPolicy
+from .store import SQLiteStore
+from .writers import (
+    COMPRESSIONS,
+    ArrowStreamPageWriter,
+    HivePartitionedWriter,
+    NDJSONPageWriter,
+    ParquetPageWriter,
+    _check_partition_by,
+)
 
-from .client import fetch
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+OUT_SUFFIXES = (".csv", ".json", ".parquet", *SQLITE_SUFFIXES)
 
 
 def main(argv: list[str] | None = None) -> int:
-    p = argparse.ArgumentParser(prog="j-staget", description="J-STAGE Search API (service=3) client")
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # "run" の後に .toml（か --help）が続くときだけバッチ実行。`j-staget run` はキーワード "run" の検索
+    if argv[:1] == ["run"] and len(argv) > 1 and (argv[1].endswith(".toml") or argv[1] in ("-h", "--help")):
+        return _run(argv[1:])
+
+    p = argparse.ArgumentParser(
+        prog="j-staget",
+        description="J-STAGE Search API (service=3) client",
+        epilog="batch mode: j-staget run jobs.toml (see j-staget run --help); to search for \"run\" use j-staget -- run",
+    )
     p.add_argument("query", help="search keyword")
     p.add_argument("--year", type=int, default=1950)
+    p.add_argument("--year-to", type=int, default=None, help="last publication year (inclusive)")
     p.add_argument("--field", choices=["article", "abst", "text"], default="article")
     p.add_argument("--max-records", type=int, default=20000)
     p.add_argument("--sleep", type=float, default=5.0)
-    p.add_argument("--out", type=str, default="", help="output file path (.csv/.json/.parquet)")
+    p.add_argument(
+        "--out",
+        type=str,
+        default="",
+        help="output file path (.csv/.json/.parquet, or .db/.sqlite to upsert into a SQLiteStore)",
+    )
+    p.add_argument("--checkpoint", type=str, default="", help="directory to persist each completed page")
+    p.add_argument("--resume", action="store_true", help="continue from the last page saved in --checkpoint")
+    p.add_argument(
+        "--count-only",
+        action="store_true",
+        help="only print total_results (one count=1 request; Polars is not loaded)",
+    )
+    p.add_argument(
+        "--shard-size",
+        type=int,
+        default=0,
+        help="split the year range into shards of at most N records and fetch them in parallel",
+    )
+    p.add_argument(
+        "--retries",
+        type=int,
+        default=0,
+        help="retry a page up to N times on connection errors, timeouts and 429/5xx (exponential backoff)",
+    )
+    p.add_argument("--cache", type=str, default="", help="directory of the on-disk response cache")
+    p.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=86400.0,
+        help="seconds a cached response is reused before it is revalidated (ETag/Last-Modified)",
+    )
+    p.add_argument(
+        "--format",
+        choices=["ndjson", "arrow"],
+        default=None,
+        help="write the records to stdout page by page (NDJSON or an Arrow IPC stream) instead of --out",
+    )
+    p.add_argument(
+        "--partition-by",
+        type=str,
+        default="",
+        metavar="COLUMNS",
+        help=(
+            "write --out as a Hive-partitioned Parquet directory split by these "
+            "comma-separated columns (e.g. pubyear,cdjournal)"
+        ),
+    )
+    p.add_argument("--compression", choices=COMPRESSIONS, default="zstd", help="Parquet compression codec")
+    p.add_argument(
+        "--row-group-size",
+        type=int,
+        default=0,
+        help="rows per Parquet row group (default: one row group per fetched page)",
+    )
     args = p.parse_args(argv)
 
-    result = fetch(
-        args.query,
-        year=args.year,
-        field=args.field,
-        max_records=args.max_records,
-        sleep=args.sleep,
-    )
+    if args.resume and not args.checkpoint:
+        p.error("--resume requires --checkpoint")
+    if args.retries < 0:
+        p.error("--retries must be >= 0")
+    if args.shard_size and args.checkpoint:
+        p.error("--shard-size cannot be combined with --checkpoint")
+    if args.row_group_size < 0:
+        p.error("--row-group-size must be >= 0")
+    if args.format and args.out:
+        p.error("--format writes to stdout and cannot be combined with --out")
+    if args.format == "arrow" and importlib.util.find_spec("pyarrow") is None:
+        p.error("--format arrow requires pyarrow: pip install pyarrow")
+    partition_by = [c.strip() for c in args.partition_by.split(",") if c.strip()]
+    if args.partition_by and not args.out:
+        p.error("--partition-by requires --out (the dataset directory)")
+    out = Path(args.out) if args.out else None
+    if out is not None and not partition_by and out.suffix.lower() not in OUT_SUFFIXES:
+        p.error("--out must end with .csv, .json, .parquet, .db or .sqlite")
 
-    if args.out:
-        out = Path(args.out)
-        out.parent.mkdir(parents=True, exist_ok=True)
-        suf = out.suffix.lower()
+    retry = RetryPolicy(max_attempts=args.retries + 1) if args.retries else None
+    cache = ResponseCache(args.cache, ttl=args.cache_ttl) if args.cache else None
+
+    if args.count_only:
+        total = count(args.query, year=args.year, year_to=args.year_to, field=args.field, retry=retry)
+        print(f"total_results={total}")
+        return 0
+
+    query = {
+        "year": args.year,
+        "year_to": args.year_to,
+        "field": args.field,
+        "sleep": args.sleep,
+        "retry": retry,
+        "cache": cache,
+    }
+    parquet = {"compression": args.compression, "row_group_size": args.row_group_size or None}
+    if partition_by:
+        try:
+            _check_partition_by(partition_by)
+        except ValueError as e:
+            p.error(f"--partition-by: {e}")
 
-        if suf == ".csv":
-            df = result.df.with_columns(
-                pl.col("author").list.join("; ").alias("author")
-            )
-            df.write_csv(out)
+    # Polars は実際にデータを取るときだけ読み込む（fetch を import すると読み込まれる）
+    if args.shard_size:
+        from ._shard import fetch_sharded
 
-        elif suf == ".json":
-            out.write_text(result.df.write_json(), encoding="utf-8")
+        result = fetch_sharded(args.query, shard_size=args.shard_size, **query)
+    elif args.format or partition_by or (out is not None and out.suffix.lower() in (".parquet", *SQLITE_SUFFIXES)):
+        # ページが届くたびに書き足す（全件をメモリに載せない）
+        from .client import iter_pages
 
-        elif suf == ".parquet":
-            result.df.write_parquet(out)
+        pages = iter_pages(
+            args.query,
+            max_records=args.max_records,
+            checkpoint_dir=args.checkpoint or None,
+            resume=args.resume,
+            **query,
+        )
+        if args.format:
+            return _stream_stdout(pages, args.format)
+        _write_pages(pages, out, partition_by, **parquet)
+        return 0
+    else:
+        from .client import fetch
 
-        else:
-            raise SystemExit("out must end with .csv or .json or .parquet")
+        result = fetch(
+            args.query,
+            max_records=args.max_records,
+            checkpoint_dir=args.checkpoint or None,
+            resume=args.resume,
+            **query,
+        )
 
+    if args.format:
+        return _stream_stdout([result.df], args.format)
+    if partition_by:
+        _write_pages([result.df], out, partition_by, **parquet)
+    elif out is not None:
+        _write_output(result.df, out, **parquet)
     else:
         # out未指定なら件数だけ表示
         print(f"rows={result.df.height} total_results={result.total_results}")
 
     return 0
+
+
+def _write_pages(pages, out: Path, partition_by: list[str], **parquet) -> None:
+    """
+    ページを届いた順に書き足す。Parquet ファイル（partition_by があれば Hive 形式のディレクトリ）か、
+    拡張子が .db/.sqlite なら SQLiteStore に upsert する。
+    """
+    if partition_by:
+        writer = HivePartitionedWriter(out, partition_by=partition_by, **parquet)
+    elif out.suffix.lower() in SQLITE_SUFFIXES:
+        out.parent.mkdir(parents=True, exist_ok=True)
+        writer = SQLiteStore(out)
+    else:
+        writer = ParquetPageWriter(out, **parquet)
+    with writer:
+        for page in pages:
+            writer.write(page)
+
+
+def _stream_stdout(pages, fmt: str) -> int:
+    """ページを標準出力に NDJSON か Arrow IPC ストリームで書き出す。"""
+    sink = sys.stdout.buffer
+    try:
+        with (NDJSONPageWriter(sink) if fmt == "ndjson" else ArrowStreamPageWriter(sink)) as writer:
+            for page in pages:
+                writer.write(page)
+    except BrokenPipeError:
+        # 読み手（head など）が先に終わった。終了時の flush で再び失敗しないよう stdout を捨てる
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    return 0
+
+
+def _write_output(df, out: Path, *, compression: str = "zstd", row_group_size: int | None = None) -> None:
+    """拡張子（.csv/.json/.parquet）に合わせて df を書き出す。"""
+    import polars as pl
+
+    suf = out.suffix.lower()
+    if suf not in OUT_SUFFIXES:
+        raise SystemExit("out must end with .csv, .json, .parquet, .db or .sqlite")
+    if suf in SQLITE_SUFFIXES:
+        _write_pages([df], out, [])
+        return
+    out.parent.mkdir(parents=True, exist_ok=True)
+
+    if suf == ".csv":
+        df.with_columns(pl.col("author").list.join("; ").alias("author")).write_csv(out)
+    elif suf == ".json":
+        out.write_text(df.write_json(), encoding="utf-8")
+    else:
+        df.write_parquet(out, compression=compression, row_group_size=row_group_size)
+
+
+# jobs.toml のジョブに書ける fetch の引数（query -> target_word, out は出力先）
+JOB_KEYS = frozenset(
+    {
+        "year",
+        "year_to",
+        "field",
+        "max_records",
+        "step",
+        "timeout",
+        "material",
+        "author",
+        "affil",
+        "issn",
+        "cdjournal",
+        "parser",
+        "stream",
+        "workers",
+        "checkpoint_dir",
+        "resume",
+    }
+)
+RUN_SETTINGS = frozenset({"workers", "sleep", "retries", "cache", "cache_ttl", "defaults", "jobs"})
+
+
+def _load_jobs(path: Path) -> tuple[dict, list[tuple[dict, Path]]]:
+    """
+    ジョブマニフェスト（TOML）を読み、(全体設定, [(fetch の引数, 出力先)]) を返す。
+    [defaults] は各 [[jobs]] に上書きされる前の値。相対パスはマニフェストの場所から解決する。
+    """
+    try:
+        import tomllib
+    except ModuleNotFoundError:  # Python 3.10
+        import tomli as tomllib
+
+    with path.open("rb") as f:
+        doc = tomllib.load(f)
+
+    unknown = doc.keys() - RUN_SETTINGS
+    if unknown:
+        raise SystemExit(f"{path}: unknown settings {sorted(unknown)}")
+    defaults = doc.get("defaults", {})
+    base = path.parent
+
+    jobs: list[tuple[dict, Path]] = []
+    for i, entry in enumerate(doc.get("jobs", [])):
+        job = {**defaults, **entry}
+        unknown = job.keys() - JOB_KEYS - {"query", "out"}
+        if unknown:
+            raise SystemExit(f"{path}: jobs[{i}]: unknown keys {sorted(unknown)}")
+        if "out" not in job:
+            raise SystemExit(f"{path}: jobs[{i}]: out is required")
+        if not str(job["out"]).lower().endswith(OUT_SUFFIXES):
+            raise SystemExit(f"{path}: jobs[{i}]: out must end with .csv, .json, .parquet, .db or .sqlite")
+        out = base / job.pop("out")
+        if "checkpoint_dir" in job:
+            job["checkpoint_dir"] = base / job["checkpoint_dir"]
+        job["target_word"] = job.pop("query", None)
+        jobs.append((job, out))
+    if not jobs:
+        raise SystemExit(f"{path}: no [[jobs]]")
+    return doc, jobs
+
+
+def _run(argv: list[str]) -> int:
+    p = argparse.ArgumentParser(prog="j-staget run", description="run the fetch jobs listed in a TOML manifest")
+    p.add_argument("manifest", help="jobs.toml (must end with .toml)")
+    p.add_argument("--workers", type=int, default=None, help="number of jobs run at once (overrides the manifest)")
+    args = p.parse_args(argv)
+
+    settings, jobs = _load_jobs(Path(args.manifest))
+    workers = args.workers if args.workers is not None else settings.get("workers", 4)
+    retries = settings.get("retries", 0)
+    if workers <= 0:
+        p.error("workers must be > 0")
+    if retries < 0:
+        p.error("retries must be >= 0")
+
+    cache = None
+    if "cache" in settings:
+        cache = ResponseCache(Path(args.manifest).parent / settings["cache"], ttl=settings.get("cache_ttl", 86400.0))
+
+    from ._batch import fetch_many
+
+    def done(i: int, result) -> None:
+        # 終わったジョブから順に書き出す
+        out = jobs[i][1]
+        _write_output(result.df, out)
+        print(f"{out}: rows={result.df.height} total_results={result.total_results}", flush=True)
+
+    results = fetch_many(
+        [job for job, _ in jobs],
+        workers=workers,
+        sleep=settings.get("sleep", 5.0),
+        retry=RetryPolicy(max_attempts=retries + 1) if retries else None,
+        cache=cache,
+        on_result=done,
+        return_exceptions=True,
+    )
+
+    failed = [(out, r) for (_, out), r in zip(jobs, results) if isinstance(r, BaseException)]
+    for out, e in failed:
+        print(f"{out}: failed: {e}", file=sys.stderr)
+    return 1 if failed else 0
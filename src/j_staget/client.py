@@ -1,37 +1,33 @@
 from __future__ import annotations
 
-import time
-import urllib.parse
+import os
+from collections import deque
+from collections.abc import Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from itertools import islice
 
 import polars as pl
 import requests
-from lxml import etree
+from requests.adapters import HTTPAdapter
+
+from ._checkpoint import Checkpoint
+from ._columns import ColumnBuilder
+from ._errors import JStageAPIError, check_status
+from ._parsers import PARSE_ERRORS, PageInfo, parse_page, resolve_parser
+from ._query import PagePlan, _build_params, _page_url
+from .cache import (
+    CachedResponse,
+    PageCache,
+    ResponseCache,
+    ResultCache,
+    conditional_headers,
+)
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy, with_retry
 
-from ._xml import NS, authors_local, get_first, pick_ja_or_first_tag_local
-
-API_URL = "https://api.jstage.jst.go.jp/searchapi/do"
 DEFAULT_STEP = 1000
-
-# target_word を入れる先（従来互換）
-ALLOWED_FIELDS = {"article", "abst", "text", "keyword"}
-
-# service=3 で「検索語として成立する」代表的パラメータ（ERR_012回避用）
-SEARCH_PARAM_KEYS = {
-    "material",
-    "article",
-    "author",
-    "affil",
-    "keyword",
-    "abst",
-    "text",
-    "issn",
-    "cdjournal",  # ここが公式
-}
-
-
-class JStageAPIError(RuntimeError):
-    """Raised when J-STAGE API request fails or returns unexpected content."""
+STREAM_CHUNK = 64 * 1024
 
 
 @dataclass(frozen=True)
@@ -40,48 +36,327 @@ class FetchResult:
     total_results: int | None
 
 
-def _q(s: str) -> str:
-    return urllib.parse.quote(s, safe="")
+def _validate(*, max_records: int, step: int, parser: str) -> None:
+    if max_records <= 0:
+        raise ValueError("max_records must be > 0")
+    if step <= 0:
+        raise ValueError("step must be > 0")
+    resolve_parser(parser)  # 不正な名前・lxml が無いときはリクエスト前にここで失敗させる
 
 
-def _get_result_status(root: etree._Element) -> str | None:
+def _is_no_results(page: PageInfo) -> bool:
     """
-    <result><status> を取得。
-    正常系では result 要素が無いことがあるので、その場合は None を返す。
+    ERR_001（条件不成立）なら True。
+    それ以外の ERR_xxx は種類ごとの例外にする。
     """
-    status = root.xpath("//*[local-name()='result']/*[local-name()='status']/text()")
-    if status:
-        s = status[0].strip()
-        return s if s else None
-    return None
+    return check_status(page.status, page.message)
 
 
-def _get_total_results_first(root: etree._Element) -> int | None:
+def _get_page(
+    session: requests.Session,
+    url: str,
+    max_rows: int,
+    *,
+    parser: str,
+    timeout: float,
+    stream: bool,
+    limiter: RateLimiter | None = None,
+    retry: RetryPolicy | None = None,
+    cache: ResponseCache | None = None,
+    page_cache: PageCache | None = None,
+) -> tuple[PageInfo, pl.DataFrame]:
+    """
+    1 ページ取得してパースし、(ページ情報, 行の DataFrame) を返す。
+    page_cache にパース済みのページがあればそれを、cache に期限内のレスポンスがあれば
+    それをパースして使う（どちらもリクエストもレート制限の待ちもしない）。
+    期限切れのものしか無ければ ETag/Last-Modified で条件付きリクエストを送り、
+    304 ならパース済みのページ（無ければ保存済みの本文）を使う。
+    retry があれば、このページだけを retry の方針でやり直す（やり直すたびに行は作り直す）。
+    """
+    stale_page = None
+    if page_cache is not None:
+        stale_page = page_cache.lookup(url)
+        if stale_page is not None and page_cache.is_fresh(stale_page):
+            return stale_page.page, stale_page.df
+
+    def remember(page: PageInfo, rows: ColumnBuilder, headers=None) -> tuple[PageInfo, pl.DataFrame]:
+        df = rows.to_frame()
+        # エラーページと、max_rows で切り詰めたページは覚えない
+        if page_cache is not None and not (page.status or "").startswith("ERR_") and len(rows) == page.entries:
+            page_cache.put(url, page, df, headers)
+        return page, df
+
+    def parse_cached(entry: CachedResponse) -> tuple[PageInfo, pl.DataFrame] | None:
+        rows = ColumnBuilder()
+        try:
+            page = parse_page(entry.body, rows, max_rows, parser)
+        except (JStageAPIError, *PARSE_ERRORS):
+            return None  # 壊れたキャッシュは無視して取り直す
+        return remember(page, rows, {"ETag": entry.etag, "Last-Modified": entry.last_modified})
+
+    stale_body = None
+    if cache is not None:
+        stale_body = cache.lookup(url)
+        if stale_body is not None and cache.is_fresh(stale_body):
+            hit = parse_cached(stale_body)
+            if hit is not None:
+                return hit
+
+    validators = stale_page or stale_body
+    conditional = conditional_headers(validators.etag, validators.last_modified) if validators else None
+
+    def once() -> tuple[PageInfo, pl.DataFrame]:
+        rows = ColumnBuilder()
+        page, headers = _get_page_once(
+            session,
+            url,
+            rows,
+            max_rows,
+            parser=parser,
+            timeout=timeout,
+            stream=stream,
+            cache=cache,
+            conditional=conditional,
+        )
+        if page is not None:
+            return remember(page, rows, headers)
+
+        # 304 Not Modified: 手元のものをそのまま使い、保存時刻を更新する
+        if stale_body is not None:
+            cache.refresh(stale_body, headers)
+        if stale_page is not None:
+            page_cache.refresh(url, stale_page, headers)
+            return stale_page.page, stale_page.df
+        hit = parse_cached(stale_body) if stale_body is not None else None
+        if hit is None:
+            raise JStageAPIError("Got 304 Not Modified without a cached page")
+        return hit
+
+    return with_retry(once, retry, limiter=limiter)
+
+
+def _get_page_once(
+    session: requests.Session,
+    url: str,
+    rows: ColumnBuilder,
+    max_rows: int,
+    *,
+    parser: str,
+    timeout: float,
+    stream: bool,
+    cache: ResponseCache | None = None,
+    conditional: dict[str, str] | None = None,
+) -> tuple[PageInfo | None, Mapping[str, str]]:
     """
-    <opensearch:totalResults> を取得。
-    ページによって None/空になることがあるので、値があるときだけ int で返す。
+    1 ページ取得してパースし、行を rows に積む。(ページ情報, レスポンスヘッダ) を返す。
+    stream=True ならレスポンスを受信しながらチャンクごとにパーサへ流す。
+    cache があれば、エラーでないページの本文を保存する。
+    conditional（If-None-Match など）を付けて 304 が返ったら、ページ情報は None。
     """
-    # 正攻法（namespaces）
-    tr = root.xpath("//opensearch:totalResults/text()", namespaces=NS)
-    if tr:
-        t = tr[0].strip()
-        if t:
-            return int(t)
+    p = resolve_parser(parser)(rows, max_rows)
+
+    try:
+        r = session.get(url, timeout=timeout, stream=stream, headers=conditional)
+        r.raise_for_status()
+    except requests.RequestException as e:
+        raise JStageAPIError(f"Request failed: {e}") from e
+    if conditional and r.status_code == 304:
+        r.close()
+        return None, r.headers
+
+    chunks: list[bytes] = []
+    try:
+        if stream:
+            checked = False
+            try:
+                for chunk in r.iter_content(chunk_size=STREAM_CHUNK):
+                    p.feed(chunk)
+                    if cache is not None:
+                        chunks.append(chunk)
+                    # エラーページならヘッダを読んだ時点で受信を打ち切る
+                    if p.header_done and not checked:
+                        checked = True
+                        h = p.header()
+                        if h.is_error:
+                            return PageInfo(h.status, h.total_results, 0, h.message), r.headers
+            except requests.RequestException as e:
+                raise JStageAPIError(f"Request failed: {e}") from e
+        else:
+            try:
+                content = r.content
+            except requests.RequestException as e:
+                raise JStageAPIError(f"Request failed: {e}") from e
+            p.feed(content)
+            chunks.append(content)
+        page = p.close()
+    except JStageAPIError:
+        raise
+    except Exception as e:
+        raise JStageAPIError("Failed to parse XML response") from e
+    finally:
+        r.close()
 
-    # フォールバック（prefix/NS差異対策）
-    tr2 = root.xpath("//*[local-name()='totalResults']/text()")
-    if tr2:
-        t2 = tr2[0].strip()
-        if t2:
-            return int(t2)
+    if cache is not None and not (page.status or "").startswith("ERR_"):
+        cache.put(url, b"".join(chunks), r.headers)
+    return page, r.headers
 
-    return None
+
+def _pooled_session(size: int) -> requests.Session:
+    """接続プールを size 本にした Session。"""
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+@dataclass(frozen=True)
+class _Page:
+    """取得済みの 1 ページ。total_results はその時点で確定している totalResults。"""
+
+    start: int
+    count: int
+    df: pl.DataFrame
+    total_results: int | None
+    no_results: bool = False
+
+
+def _iter_pages(
+    session: requests.Session,
+    base_params: dict[str, str],
+    *,
+    max_records: int,
+    step: int,
+    workers: int,
+    limiter: RateLimiter,
+    retry: RetryPolicy | None,
+    cache: ResponseCache | None,
+    page_cache: PageCache | None,
+    parser: str,
+    timeout: float,
+    stream: bool,
+    start: int = 1,
+    fetched: int = 0,
+    total_results: int | None = None,
+) -> Iterator[_Page]:
+    """
+    start から順にページを取得して返す（fetched は取得済み件数）。取り方は PagePlan のとおり。
+    空のページか ERR_001 を返したら終了する。
+    """
+    plan = PagePlan(max_records, step, start=start, fetched=fetched, total_results=total_results)
+    while (nxt := plan.next_page()) is not None:
+        start, count = nxt
+        page, df = _get_page(
+            session,
+            _page_url(base_params, start, count),
+            count,
+            parser=parser,
+            timeout=timeout,
+            stream=stream,
+            limiter=limiter,
+            retry=retry,
+            cache=cache,
+            page_cache=page_cache,
+        )
+
+        # ERR_001 のときは「条件不成立」
+        if _is_no_results(page):
+            yield _Page(start, count, df, 0, no_results=True)
+            return
+        plan.record(count, page.total_results, df.height)
+        yield _Page(start, count, df, plan.total_results)
+
+    windows = plan.windows()
+    if not windows:
+        return
+    yield from _iter_windows(
+        session,
+        base_params,
+        windows,
+        total_results=plan.total_results,
+        workers=workers,
+        limiter=limiter,
+        retry=retry,
+        cache=cache,
+        page_cache=page_cache,
+        parser=parser,
+        timeout=timeout,
+        stream=stream,
+    )
+
+
+def _iter_windows(
+    session: requests.Session,
+    base_params: dict[str, str],
+    windows: list[tuple[int, int]],
+    *,
+    total_results: int,
+    workers: int,
+    limiter: RateLimiter,
+    retry: RetryPolicy | None,
+    cache: ResponseCache | None,
+    page_cache: PageCache | None,
+    parser: str,
+    timeout: float,
+    stream: bool,
+) -> Iterator[_Page]:
+    """
+    (start, count) の窓を取得・パースし、start 順に返す。workers > 1 ならスレッドプールで並行に取る。
+    途中で空のページがあれば、そこで終了する（逐次取得と同じ結果にする）。
+    """
+
+    def get(s: int, c: int) -> tuple[PageInfo, pl.DataFrame]:
+        return _get_page(
+            session,
+            _page_url(base_params, s, c),
+            c,
+            parser=parser,
+            timeout=timeout,
+            stream=stream,
+            limiter=limiter,
+            retry=retry,
+            cache=cache,
+            page_cache=page_cache,
+        )
+
+    pool = None
+    pending: deque = deque()
+    if workers <= 1:
+        results = (get(s, c) for s, c in windows)
+    else:
+        # 先読みは workers * 2 ページまで（読み手が遅くても取得済みページを溜め込まない）
+        pool = ThreadPoolExecutor(max_workers=workers)
+        todo = iter(windows)
+        pending = deque(pool.submit(get, s, c) for s, c in islice(todo, workers * 2))
+
+        def drain() -> Iterator[tuple[PageInfo, pl.DataFrame]]:
+            while pending:
+                result = pending.popleft().result()
+                for s, c in islice(todo, 1):
+                    pending.append(pool.submit(get, s, c))
+                yield result
+
+        results = drain()
+    try:
+        for (s, c), (page, df) in zip(windows, results):
+            if _is_no_results(page):
+                yield _Page(s, c, df, 0, no_results=True)
+                return
+            yield _Page(s, c, df, total_results)
+            if not df.height:
+                return
+    finally:
+        if pool is not None:
+            for fut in pending:
+                fut.cancel()
+            pool.shutdown()
 
 
 def fetch(
     target_word: str | None = None,
     *,
     year: int = 1950,
+    year_to: int | None = None,
     field: str = "article",
     max_records: int = 20000,
     sleep: float = 5.0,
@@ -94,158 +369,282 @@ def fetch(
     affil: str | None = None,
     issn: str | None = None,  # ISSN
     cdjournal: str | None = None,
+    parser: str = "auto",
+    stream: bool = False,
+    workers: int = 1,
+    rate_limiter: RateLimiter | None = None,
+    checkpoint_dir: str | os.PathLike | None = None,
+    resume: bool = False,
+    retry: RetryPolicy | None = None,
+    cache: ResponseCache | None = None,
+    page_cache: PageCache | None = None,
+    result_cache: str | os.PathLike | ResultCache | None = None,
 ) -> FetchResult:
     """
     Fetch records from J-STAGE Search API (service=3).
+
+    parser selects the XML backend: "lxml" (element tree), "iterparse"
+    (streaming lxml), "expat" (stdlib event handler, no lxml needed) or
+    "auto" (lxml when it is installed, otherwise expat).
+
+    stream=True requests each page with ``stream=True`` and feeds the body
+    to the parser chunk by chunk while it downloads.
+
+    workers > 1 fetches and parses the pages after the first one on a thread
+    pool of that size once totalResults is known. The result is identical
+    to workers=1.
+
+    Requests are paced by ``rate_limiter`` when given (share one instance,
+    or a FileRateLimiter, across fetches); otherwise by a private limiter
+    allowing one request start every ``sleep`` seconds.
+
+    checkpoint_dir persists every completed page together with the query
+    and the next ``start``; resume=True continues an interrupted crawl from
+    the last committed page instead of starting over.
+
+    retry (a RetryPolicy) retries a page that failed with a transient error
+    (connection error, timeout, 429/5xx) with exponential backoff, honouring
+    Retry-After; pages fetched before it are kept.
+
+    cache (a ResponseCache) serves pages stored by earlier calls from disk
+    without a request or a rate-limit wait, and stores the pages it fetches.
+    page_cache (a PageCache) does the same in memory with parsed pages, so a
+    hit also skips the XML parse.
+
+    result_cache (a directory or ResultCache) stores the final DataFrame as
+    Parquet keyed by the query and max_records; a repeat call returns a
+    memory-mapped read of it without fetching anything.
     """
-    if field not in ALLOWED_FIELDS:
-        raise ValueError(f"field must be one of {sorted(ALLOWED_FIELDS)}")
-    if max_records <= 0:
-        raise ValueError("max_records must be > 0")
-    if step <= 0:
-        raise ValueError("step must be > 0")
+    _validate(max_records=max_records, step=step, parser=parser)
+    if workers <= 0:
+        raise ValueError("workers must be > 0")
+    base_params = _build_params(
+        target_word,
+        year=year,
+        year_to=year_to,
+        field=field,
+        material=material,
+        author=author,
+        affil=affil,
+        issn=issn,
+        cdjournal=cdjournal,
+    )
+
+    result_key = None
+    if result_cache is not None:
+        if not isinstance(result_cache, ResultCache):
+            result_cache = ResultCache(result_cache)
+        result_key = ResultCache.key(base_params, max_records)
+        cached = result_cache.get(result_key)
+        if cached is not None:
+            return cached
+
+    frames: list[pl.DataFrame] = []
+    total_results: int | None = None
+    for page in _fetch_pages(
+        base_params,
+        max_records=max_records,
+        sleep=sleep,
+        step=step,
+        timeout=timeout,
+        session=session,
+        parser=parser,
+        stream=stream,
+        workers=workers,
+        rate_limiter=rate_limiter,
+        checkpoint_dir=checkpoint_dir,
+        resume=resume,
+        retry=retry,
+        cache=cache,
+        page_cache=page_cache,
+    ):
+        # ERR_001 のときは「条件不成立」なので 0 件として返す
+        if page.no_results:
+            frames, total_results = [], 0
+            break
+        if total_results is None:
+            total_results = page.total_results
+        if page.df.height:
+            frames.append(page.df)
 
-    # まず検索条件（start/count以外）を組み立て
-    base_params: dict[str, str] = {
-        "service": "3",
-        "pubyearfrom": str(int(year)),
-    }
-
-    # 既存互換: target_word + field
-    if target_word is not None and target_word.strip():
-        base_params[field] = target_word.strip()
-
-    # 追加条件
-    if material:
-        base_params["material"] = material
-    if author:
-        base_params["author"] = author
-    if affil:
-        base_params["affil"] = affil
-    if issn:
-        base_params["issn"] = issn
-    if cdjournal:
-        base_params["cdjournal"] = cdjournal
-
-    # 「検索語が何もない」状態を弾く（yearだけ等）
-    if not any(k in base_params for k in SEARCH_PARAM_KEYS):
-        raise ValueError(
-            "At least one search parameter must be provided: "
-            "target_word (with field), material, author, affil, issn, or cdjournal."
-        )
+    df = pl.concat(frames) if frames else ColumnBuilder().to_frame()
 
-    all_data: list[dict] = []
+    # 保険：total_results が最後まで取れなかった場合は「取得件数」を入れる（Noneのままより扱いやすい）
+    if total_results is None:
+        total_results = df.height
 
-    owns_session = session is None
-    if owns_session:
-        session = requests.Session()
+    result = FetchResult(df=df, total_results=total_results)
+    if result_key is not None:
+        result_cache.put(result_key, result, base_params)
+    return result
 
-    try:
-        start_idx = 1
-        total_results: int | None = None
 
-        while True:
-            params = dict(base_params)
-            params["start"] = str(start_idx)
-            params["count"] = str(int(step))
+def iter_pages(
+    target_word: str | None = None,
+    *,
+    year: int = 1950,
+    year_to: int | None = None,
+    field: str = "article",
+    max_records: int = 20000,
+    sleep: float = 5.0,
+    step: int = DEFAULT_STEP,
+    timeout: float = 30.0,
+    session: requests.Session | None = None,
+    material: str | None = None,
+    author: str | None = None,
+    affil: str | None = None,
+    issn: str | None = None,
+    cdjournal: str | None = None,
+    parser: str = "auto",
+    stream: bool = False,
+    workers: int = 1,
+    rate_limiter: RateLimiter | None = None,
+    checkpoint_dir: str | os.PathLike | None = None,
+    resume: bool = False,
+    retry: RetryPolicy | None = None,
+    cache: ResponseCache | None = None,
+    page_cache: PageCache | None = None,
+) -> Iterator[pl.DataFrame]:
+    """
+    Iterate over J-STAGE Search API pages, one typed DataFrame per page.
+
+    Each page is yielded as soon as it has been parsed, so only about one
+    page is held in memory (with workers > 1, at most ``2 * workers`` pages
+    are read ahead). Concatenating the pages gives ``fetch(...).df``.
+    Arguments are the same as :func:`j_staget.fetch` except ``result_cache``,
+    which needs the whole result. Arguments are validated on the call; the
+    first request is sent when iteration starts.
+    """
+    _validate(max_records=max_records, step=step, parser=parser)
+    if workers <= 0:
+        raise ValueError("workers must be > 0")
+    if resume and checkpoint_dir is None:
+        raise ValueError("resume=True requires checkpoint_dir")
+    base_params = _build_params(
+        target_word,
+        year=year,
+        year_to=year_to,
+        field=field,
+        material=material,
+        author=author,
+        affil=affil,
+        issn=issn,
+        cdjournal=cdjournal,
+    )
+    pages = _fetch_pages(
+        base_params,
+        max_records=max_records,
+        sleep=sleep,
+        step=step,
+        timeout=timeout,
+        session=session,
+        parser=parser,
+        stream=stream,
+        workers=workers,
+        rate_limiter=rate_limiter,
+        checkpoint_dir=checkpoint_dir,
+        resume=resume,
+        retry=retry,
+        cache=cache,
+        page_cache=page_cache,
+    )
+    return (page.df for page in pages if page.df.height)
+
+
+def iter_records(target_word: str | None = None, *, named: bool = True, **kwargs) -> Iterator[dict | tuple]:
+    """
+    Iterate over records one by one, page by page as they arrive.
+
+    Yields a dict per record (a tuple in column order with ``named=False``),
+    with the same values and types as the rows of ``fetch(...).df``.
+    Other arguments are the same as :func:`iter_pages`.
+    """
+    pages = iter_pages(target_word, **kwargs)
+    return (row for df in pages for row in df.iter_rows(named=named))
 
-            query_str = "&".join(f"{k}={_q(v)}" for k, v in params.items())
-            url = f"{API_URL}?{query_str}"
 
-            try:
-                r = session.get(url, timeout=timeout)
-                r.raise_for_status()
-            except requests.RequestException as e:
-                raise JStageAPIError(f"Request failed: {e}") from e
+def _fetch_pages(
+    base_params: dict[str, str],
+    *,
+    max_records: int,
+    sleep: float,
+    step: int,
+    timeout: float,
+    session: requests.Session | None,
+    parser: str,
+    stream: bool,
+    workers: int,
+    rate_limiter: RateLimiter | None,
+    checkpoint_dir: str | os.PathLike | None,
+    resume: bool,
+    retry: RetryPolicy | None,
+    cache: ResponseCache | None,
+    page_cache: PageCache | None,
+) -> Iterator[_Page]:
+    """
+    fetch / iter_pages の本体。ページを start 順に返す（resume したときは保存済みのページから）。
+    checkpoint_dir があればページごとに保存する。ERR_001 なら no_results のページを返して終わる。
+    """
+    limiter = rate_limiter if rate_limiter is not None else RateLimiter.from_interval(sleep)
+
+    checkpoint: Checkpoint | None = None
+    if checkpoint_dir is not None:
+        checkpoint = Checkpoint(checkpoint_dir, {"params": base_params, "max_records": max_records, "step": step})
+    elif resume:
+        raise ValueError("resume=True requires checkpoint_dir")
+
+    start_idx = 1
+    fetched = 0
+    total_results: int | None = None
+    complete = False
+    if checkpoint is not None:
+        if resume:
+            state = checkpoint.load()
+            start_idx, total_results, complete = state.next_start, state.total_results, state.complete
+            fetched = sum(f.height for f in state.frames)
+            for f in state.frames:
+                yield _Page(0, 0, f, total_results)
+        else:
+            checkpoint.reset()
+    if complete:
+        return
 
-            try:
-                root = etree.fromstring(r.content)
-            except Exception as e:
-                raise JStageAPIError("Failed to parse XML response") from e
+    owns_session = session is None
+    if owns_session:
+        session = requests.Session() if workers == 1 else _pooled_session(workers)
 
-            # ERR_001 のときは「条件不成立」なので即停止して 0 件として返す
-            status = _get_result_status(root)
-            if status == "ERR_001":
-                return FetchResult(df=pl.DataFrame([]), total_results=0)
+    try:
+        for page in _iter_pages(
+            session,
+            base_params,
+            max_records=max_records,
+            step=step,
+            workers=workers,
+            limiter=limiter,
+            retry=retry,
+            cache=cache,
+            page_cache=page_cache,
+            parser=parser,
+            timeout=timeout,
+            stream=stream,
+            start=start_idx,
+            fetched=fetched,
+            total_results=total_results,
+        ):
+            if page.no_results:
+                if checkpoint is not None:
+                    checkpoint.finish(0)
+                yield page
+                return
 
-            # totalResults は「最初に取れた値」を固定（最後のページで None になっても上書きしない）
             if total_results is None:
-                total_results = _get_total_results_first(root)
-
-            entries = root.xpath("//atom:entry", namespaces=NS)
-
-            # 初回ページで 0 件
-            if start_idx == 1 and not entries:
-                break
-
-            # entry が空
-            if not entries:
-                break
-
-            prev_len = len(all_data)
-
-            for entry in entries:
-                all_data.append(
-                    {
-                        "author": authors_local(entry),
-                        "article_title": pick_ja_or_first_tag_local(entry, "article_title"),
-                        "material_title": pick_ja_or_first_tag_local(entry, "material_title"),
-                        "cdjournal": get_first(entry, "atom:cdjournal"),
-                        "p_issn": get_first(entry, "prism:issn"),
-                        "o_issn": get_first(entry, "prism:eIssn"),
-                        "article_link": pick_ja_or_first_tag_local(entry, "article_link"),
-                        "pubyear": get_first(entry, "atom:pubyear"),
-                        "doi": get_first(entry, "prism:doi"),
-                        "volume": get_first(entry, "prism:volume"),
-                        "cdvols": entry.xpath("./*[local-name()='cdvols']/text()")[0].strip()
-                        if entry.xpath("./*[local-name()='cdvols']/text()")
-                        else None,
-                        "number": get_first(entry, "prism:number"),
-                        "starting_page": get_first(entry, "prism:startingPage"),
-                        "ending_page": get_first(entry, "prism:endingPage"),
-                    }
-                )
-                if len(all_data) >= max_records:
-                    break
-
-            # データが増えなかった（異常系）
-            if len(all_data) == prev_len:
-                break
-
-            if len(all_data) >= max_records:
-                break
-
-            start_idx += step
-            if total_results is not None and start_idx > total_results:
-                break
-
-            time.sleep(float(sleep))
-
-        df = pl.DataFrame(all_data)
-
-        if not df.is_empty():
-            df = df.with_columns(
-                [
-                    pl.col("p_issn").cast(pl.Utf8, strict=False),
-                    pl.col("o_issn").cast(pl.Utf8, strict=False),
-                    pl.col("cdjournal").cast(pl.Utf8, strict=False),
-                    pl.col("author").cast(pl.List(pl.Utf8), strict=False),
-                    pl.col("pubyear").cast(pl.Int32, strict=False),
-                    pl.col("starting_page").cast(pl.Int32, strict=False),
-                    pl.col("ending_page").cast(pl.Int32, strict=False),
-                    pl.when(pl.col("doi").is_not_null())
-                    .then(pl.concat_str([pl.lit("https://doi.org/"), pl.col("doi")]))
-                    .otherwise(None)
-                    .alias("url_doi"),
-                ]
-            )
-
-        # 保険：total_results が最後まで取れなかった場合は「取得件数」を入れる（Noneのままより扱いやすい）
-        if total_results is None:
-            total_results = len(all_data)
-
-        return FetchResult(df=df, total_results=total_results)
+                total_results = page.total_results
+            if checkpoint is not None:
+                checkpoint.commit(page.start, page.df, next_start=page.start + page.count, total_results=total_results)
+            yield page
 
+        if checkpoint is not None:
+            checkpoint.finish(total_results)
     finally:
         if owns_session and session is not None:
             session.close()
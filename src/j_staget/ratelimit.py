@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import threading
+import time
+
+from ._filelock import locked
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every fetch that is given the same instance.
+
+    ``rate`` tokens are added per second up to ``burst``; each request takes
+    one token. Waiting time is computed from when the previous request
+    started, so time spent downloading and parsing is not added on top.
+    Thread-safe; use :meth:`acquire` from threads and :meth:`acquire_async`
+    from asyncio code.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        if burst < 1:
+            raise ValueError("burst must be >= 1")
+        self.rate = float(rate)
+        self.burst = int(burst)
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_interval(cls, interval: float) -> RateLimiter:
+        """1 リクエストあたり interval 秒（fetch の sleep 相当）。0 以下なら無制限。"""
+        if interval <= 0:
+            return cls(math.inf)
+        return cls(1.0 / interval)
+
+    def reserve(self) -> float:
+        """トークンを 1 つ予約し、使えるようになるまでの秒数を返す（待つのは呼び出し側）。"""
+        if math.isinf(self.rate):
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens, self._last = _take(self._tokens, self._last, now, self.rate, self.burst)
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class FileRateLimiter(RateLimiter):
+    """
+    :class:`RateLimiter` whose bucket lives in a lock file, so every process on
+    the host that uses the same ``path`` shares a single politeness budget.
+    """
+
+    def __init__(self, path: str | os.PathLike, rate: float, burst: int = 1) -> None:
+        super().__init__(rate, burst)
+        self.path = os.fspath(path)
+
+    def reserve(self) -> float:
+        if math.isinf(self.rate):
+            return 0.0
+        # プロセス間で比べるので壁時計を使う
+        with self._lock, locked(self.path) as fd:
+            now = time.time()
+            raw = os.pread(fd, 64, 0) if hasattr(os, "pread") else _read_all(fd)
+            try:
+                tokens, last = (float(x) for x in raw.decode("ascii").split())
+            except ValueError:
+                tokens, last = float(self.burst), now
+            tokens, last = _take(tokens, last, now, self.rate, self.burst)
+            data = f"{tokens!r} {last!r}".encode("ascii")
+            os.ftruncate(fd, 0)
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.write(fd, data)
+            return max(0.0, -tokens / self.rate)
+
+
+def _take(tokens: float, last: float, now: float, rate: float, burst: int) -> tuple[float, float]:
+    """now まで補充してから 1 つ取り出す。足りなければ負になる（= 予約の待ち行列）。"""
+    if now > last:
+        tokens = min(float(burst), tokens + (now - last) * rate)
+        last = now
+    return tokens - 1.0, last
+
+
+def _read_all(fd: int) -> bytes:
+    os.lseek(fd, 0, os.SEEK_SET)
+    return os.read(fd, 64)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import email.utils
+import random
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, TypeVar
+
+import requests
+
+from ._errors import JStageAPIError
+
+if TYPE_CHECKING:
+    from .ratelimit import RateLimiter
+
+T = TypeVar("T")
+
+# Retry-After を読むステータス
+RETRY_AFTER_STATUSES = frozenset({429, 503})
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Retry a single failed page with exponential backoff.
+
+    The wait before attempt ``n + 1`` is ``backoff * multiplier ** (n - 1)``
+    capped at ``max_backoff``, randomised by ``±jitter`` (a fraction). On 429
+    and 503 a ``Retry-After`` header, when present and longer, is honoured.
+    Connection errors, timeouts, broken downloads and ``retry_statuses``
+    are retried; anything else fails immediately.
+    """
+
+    max_attempts: int = 5
+    backoff: float = 1.0
+    multiplier: float = 2.0
+    max_backoff: float = 60.0
+    jitter: float = 0.1
+    retry_statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+
+    def __post_init__(self) -> None:
+        if self.max_attempts < 1:
+            raise ValueError("max_attempts must be >= 1")
+        if not 0 <= self.jitter <= 1:
+            raise ValueError("jitter must be between 0 and 1")
+
+    def is_retryable(self, exc: BaseException) -> bool:
+        if isinstance(exc, requests.HTTPError):
+            return exc.response is not None and exc.response.status_code in self.retry_statuses
+        return isinstance(exc, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError))
+
+    def delay(self, attempt: int, exc: BaseException | None = None) -> float:
+        """attempt 回目（1 始まり）が失敗した後に待つ秒数。"""
+        d = min(self.backoff * self.multiplier ** (attempt - 1), self.max_backoff)
+        if self.jitter:
+            d *= 1 + random.uniform(-self.jitter, self.jitter)
+        retry_after = _retry_after(exc)
+        if retry_after is not None:
+            d = max(d, retry_after)
+        return max(d, 0.0)
+
+
+def _retry_after(exc: BaseException | None) -> float | None:
+    """429/503 の Retry-After（秒数 or HTTP-date）を秒で返す。"""
+    resp = getattr(exc, "response", None)
+    if resp is None or resp.status_code not in RETRY_AFTER_STATUSES:
+        return None
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def with_retry(fn: Callable[[], T], retry: RetryPolicy | None, *, limiter: RateLimiter | None = None) -> T:
+    """
+    fn() を呼ぶ（試行ごとに limiter を通す）。
+    原因が retry の対象になる JStageAPIError なら、待ってから fn() をやり直す。
+    """
+    attempt = 1
+    while True:
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return fn()
+        except JStageAPIError as e:
+            cause = e.__cause__
+            if (
+                retry is None
+                or attempt >= retry.max_attempts
+                or not isinstance(cause, requests.RequestException)
+                or not retry.is_retryable(cause)
+            ):
+                raise
+            time.sleep(retry.delay(attempt, cause))
+            attempt += 1
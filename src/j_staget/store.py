@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import polars as pl
+
+TABLE = "records"
+INDEXED_COLUMNS = ("pubyear", "cdjournal", "p_issn", "o_issn")
+
+
+class SQLiteStore:
+    """
+    Local SQLite mirror of fetched records, deduplicated by DOI.
+
+    :meth:`write` takes one page (or any frame returned by
+    :func:`j_staget.fetch` / :func:`j_staget.iter_pages`) and upserts its rows
+    into the ``records`` table with one ``executemany`` per page inside one
+    transaction. A record with a ``doi`` replaces the stored record with the
+    same ``doi``; a record without one replaces the record with the same
+    ``article_link`` (and is skipped if that link is already stored with a
+    DOI). Records with neither are always inserted.
+
+    ``records`` has the columns of the fetched DataFrame (``author`` as a JSON
+    array) and indexes on ``pubyear``, ``cdjournal``, ``p_issn`` and
+    ``o_issn``. Query it through :attr:`connection` or any SQLite client.
+    """
+
+    def __init__(self, path: str | os.PathLike = ":memory:") -> None:
+        from ._columns import INT_COLUMNS, SCHEMA
+
+        self.columns = list(SCHEMA)
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+
+        cols = ", ".join(f"{c} {'INTEGER' if c in INT_COLUMNS else 'TEXT'}" for c in self.columns)
+        with self.connection:
+            self.connection.execute(f"CREATE TABLE IF NOT EXISTS {TABLE} ({cols})")
+            self.connection.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {TABLE}_doi ON {TABLE}(doi)")
+            # DOI の無いレコードだけ article_link で一意にする（部分インデックス）
+            self.connection.execute(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {TABLE}_article_link ON {TABLE}(article_link) WHERE doi IS NULL"
+            )
+            for c in INDEXED_COLUMNS:
+                self.connection.execute(f"CREATE INDEX IF NOT EXISTS {TABLE}_{c} ON {TABLE}({c})")
+
+        names = ", ".join(self.columns)
+        values = ", ".join("?" for _ in self.columns)
+        update = ", ".join(f"{c} = excluded.{c}" for c in self.columns if c != "doi")
+        self._upsert_doi = f"INSERT INTO {TABLE} ({names}) VALUES ({values}) ON CONFLICT(doi) DO UPDATE SET {update}"
+        # DOI 無しの行。同じ article_link が DOI 付きで入っていれば入れない
+        # （INSERT ... SELECT の ON CONFLICT は SELECT に WHERE が必要）
+        self._upsert_link = (
+            f"INSERT INTO {TABLE} ({names}) SELECT {values} "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {TABLE} WHERE article_link = ? AND doi IS NOT NULL) "
+            f"ON CONFLICT(article_link) WHERE doi IS NULL DO UPDATE SET {update}"
+        )
+        # 以前 DOI 無しで入ったレコードに DOI が付いたら、古い行を消してから入れる
+        self._drop_link = f"DELETE FROM {TABLE} WHERE article_link = ? AND doi IS NULL"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute(f"SELECT count(*) FROM {TABLE}").fetchone()[0]
+
+    def write(self, df: pl.DataFrame) -> None:
+        """1 ページ分を 1 トランザクションで upsert する。"""
+        if not df.height:
+            return
+        author, doi, link = (self.columns.index(c) for c in ("author", "doi", "article_link"))
+        with_doi: list[list] = []
+        without_doi: list[list] = []
+        for row in df.select(self.columns).iter_rows():
+            row = list(row)
+            if row[author] is not None:
+                row[author] = json.dumps(row[author], ensure_ascii=False)
+            if row[doi] is not None:
+                with_doi.append(row)
+            else:
+                without_doi.append([*row, row[link]])
+
+        with self.connection:
+            if with_doi:
+                self.connection.executemany(self._drop_link, [(r[link],) for r in with_doi if r[link] is not None])
+                self.connection.executemany(self._upsert_doi, with_doi)
+            if without_doi:
+                self.connection.executemany(self._upsert_link, without_doi)
+
+    def close(self) -> None:
+        self.connection.close()
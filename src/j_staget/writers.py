@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import os
+import urllib.parse
+import uuid
+from collections import OrderedDict
+from collections.abc import Sequence
+from pathlib import Path
+from typing import IO, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import polars as pl
+
+COMPRESSIONS = ("zstd", "snappy", "gzip", "lz4", "brotli", "uncompressed")
+HIVE_NULL = "__HIVE_DEFAULT_PARTITION__"
+
+
+def _check_parquet_args(compression: str, row_group_size: int | None) -> None:
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"compression must be one of {', '.join(COMPRESSIONS)}")
+    if row_group_size is not None and row_group_size <= 0:
+        raise ValueError("row_group_size must be > 0")
+
+
+def _check_partition_by(partition_by: Sequence[str]) -> list[str]:
+    """partition_by を検査して list にする。パーティションにできない列なら ValueError。"""
+    from ._columns import SCHEMA
+
+    columns = list(partition_by)
+    if not columns:
+        raise ValueError("partition_by must name at least one column")
+    for c in columns:
+        if c not in SCHEMA or c == "author":
+            raise ValueError(f"cannot partition by {c!r}")
+    if len(set(columns)) != len(columns):
+        raise ValueError("partition_by has duplicate columns")
+    return columns
+
+
+class _PageWriter:
+    """ページの DataFrame を届いた順に書き足す writer の共通部分（with で close する）。"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def write(self, df: pl.DataFrame) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+
+class ParquetPageWriter(_PageWriter):
+    """
+    Write pages to one Parquet file as they arrive.
+
+    The file is opened on the first :meth:`write` and every page is appended
+    as its own row group, so the whole result never has to be in memory.
+    With ``row_group_size`` set, pages are buffered and written in row groups
+    of exactly that many rows instead (the last one may be smaller).
+    :meth:`close` writes the footer; used as a context manager the file is
+    closed even when fetching fails, which leaves a readable file with the
+    pages written so far.
+
+    Requires pyarrow for streaming. Without it the pages are collected and
+    written in one go on :meth:`close`, as ``DataFrame.write_parquet`` would.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        *,
+        compression: str = "zstd",
+        row_group_size: int | None = None,
+    ) -> None:
+        _check_parquet_args(compression, row_group_size)
+        self.path = Path(path)
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self._writer = None
+        self._pending: list[pl.DataFrame] = []  # row_group_size に満たない残り（pyarrow が無ければ全ページ）
+        self._closed = False
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            self._streaming = False
+        else:
+            self._streaming = True
+
+    def write(self, df: pl.DataFrame) -> None:
+        """1 ページ分の DataFrame を書き足す。"""
+        if self._closed:
+            raise ValueError("write to a closed ParquetPageWriter")
+        if not df.height:
+            return
+        self.rows += df.height
+        if not self._streaming:
+            self._pending.append(df)
+        elif self.row_group_size is None:
+            self._write_group(df)
+        else:
+            self._pending.append(df)
+            self._flush(final=False)
+
+    def _flush(self, *, final: bool) -> None:
+        """溜まった行を row_group_size 行ずつ書く。final なら端数も書く。"""
+        import polars as pl
+
+        if not self._pending:
+            return
+        buf = pl.concat(self._pending) if len(self._pending) > 1 else self._pending[0]
+        size = self.row_group_size or buf.height
+        n = buf.height if final else buf.height // size * size
+        for offset in range(0, n, size):
+            self._write_group(buf.slice(offset, min(size, n - offset)))
+        self._pending = [buf.slice(n)] if buf.height > n else []
+
+    def _write_group(self, df: pl.DataFrame) -> None:
+        import pyarrow.parquet as pq
+
+        table = df.to_arrow()
+        if self._writer is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            codec = "none" if self.compression == "uncompressed" else self.compression
+            self._writer = pq.ParquetWriter(self.path, table.schema, compression=codec)
+        self._writer.write_table(table, row_group_size=table.num_rows)
+
+    def close(self) -> None:
+        """残りを書き、フッタを書いてファイルを閉じる。1 行も無ければ列だけのファイルを書く。"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._streaming:
+            self._flush(final=True)
+        if self._writer is not None:
+            self._writer.close()
+            return
+
+        import polars as pl
+
+        from ._columns import ColumnBuilder
+
+        df = pl.concat(self._pending) if self._pending else ColumnBuilder().to_frame()
+        self._pending = []
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        df.write_parquet(self.path, compression=self.compression, row_group_size=self.row_group_size)
+
+
+class NDJSONPageWriter(_PageWriter):
+    """
+    Write pages as newline-delimited JSON (one object per record) to a binary
+    file such as ``sys.stdout.buffer``. The file is flushed after every page
+    so that a reader on the other end of a pipe sees records as they arrive.
+    """
+
+    def __init__(self, sink: IO[bytes]) -> None:
+        self.sink = sink
+        self.rows = 0
+
+    def write(self, df: pl.DataFrame) -> None:
+        """1 ページ分を書いて flush する。"""
+        if not df.height:
+            return
+        self.rows += df.height
+        df.write_ndjson(self.sink)
+        self.sink.flush()
+
+    def close(self) -> None:
+        self.sink.flush()
+
+
+class ArrowStreamPageWriter(_PageWriter):
+    """
+    Write pages as one Arrow IPC stream, one record batch per page, to a
+    binary file such as ``sys.stdout.buffer``. Readers such as
+    ``pyarrow.ipc.open_stream`` or ``polars.read_ipc_stream`` get the typed
+    columns without re-encoding. :meth:`close` ends the stream; an empty
+    result is a stream with the schema and no batches. Requires pyarrow.
+    """
+
+    def __init__(self, sink: IO[bytes]) -> None:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("ArrowStreamPageWriter requires pyarrow: pip install pyarrow") from e
+        self.sink = sink
+        self.rows = 0
+        self._writer = None
+        self._closed = False
+
+    def _open(self, schema) -> None:
+        import pyarrow as pa
+
+        self._writer = pa.ipc.new_stream(self.sink, schema)
+
+    def write(self, df: pl.DataFrame) -> None:
+        """1 ページ分を record batch として書いて flush する。"""
+        if self._closed:
+            raise ValueError("write to a closed ArrowStreamPageWriter")
+        if not df.height:
+            return
+        self.rows += df.height
+        table = df.to_arrow()
+        if self._writer is None:
+            self._open(table.schema)
+        for batch in table.to_batches():
+            self._writer.write_batch(batch)
+        self.sink.flush()
+
+    def close(self) -> None:
+        """ストリームの終端を書く。1 行も無ければスキーマだけ書く。"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is None:
+            from ._columns import ColumnBuilder
+
+            self._open(ColumnBuilder().to_frame().to_arrow().schema)
+        self._writer.close()
+        self.sink.flush()
+
+
+def _hive_value(value) -> str:
+    """Hive 形式のディレクトリ名に使う値。None は HIVE_NULL、'/' や '=' などは %XX にする。"""
+    if value is None:
+        return HIVE_NULL
+    return urllib.parse.quote(str(value), safe="")
+
+
+class HivePartitionedWriter(_PageWriter):
+    """
+    Write pages as a Hive-partitioned Parquet dataset under ``directory``.
+
+    Rows are split by ``partition_by`` (default ``pubyear`` and ``cdjournal``)
+    into ``pubyear=2001/cdjournal=xyz/part-<id>-<n>.parquet``; missing values
+    go to ``__HIVE_DEFAULT_PARTITION__``. The partition columns are stored in
+    the path only, as Hive readers expect, so read the dataset with
+    ``pl.scan_parquet(directory, hive_partitioning=True)`` or DuckDB's
+    ``read_parquet(..., hive_partitioning = true)``.
+
+    Each partition has its own :class:`ParquetPageWriter`, so pages are
+    appended as they arrive. At most ``max_open`` files are open at once; the
+    least recently used one is closed and its partition continues in a new
+    part file. Every writer uses a fresh ``<id>``, so writing into an
+    existing dataset adds files and never overwrites them.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        *,
+        partition_by: Sequence[str] = ("pubyear", "cdjournal"),
+        compression: str = "zstd",
+        row_group_size: int | None = None,
+        max_open: int = 64,
+    ) -> None:
+        self.partition_by = _check_partition_by(partition_by)
+        if max_open <= 0:
+            raise ValueError("max_open must be > 0")
+        _check_parquet_args(compression, row_group_size)
+        self.directory = Path(directory)
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self.max_open = max_open
+        self.rows = 0
+        self._id = uuid.uuid4().hex[:12]
+        self._open: OrderedDict[tuple, ParquetPageWriter] = OrderedDict()
+        self._parts: dict[tuple, int] = {}  # パーティションごとに作った part ファイルの数
+        self._closed = False
+
+    def _writer(self, key: tuple) -> ParquetPageWriter:
+        w = self._open.get(key)
+        if w is not None:
+            self._open.move_to_end(key)
+            return w
+        if len(self._open) >= self.max_open:
+            _, oldest = self._open.popitem(last=False)
+            oldest.close()
+        n = self._parts.get(key, 0)
+        self._parts[key] = n + 1
+        path = self.directory.joinpath(*(f"{c}={_hive_value(v)}" for c, v in zip(self.partition_by, key)))
+        w = ParquetPageWriter(
+            path / f"part-{self._id}-{n:05d}.parquet",
+            compression=self.compression,
+            row_group_size=self.row_group_size,
+        )
+        self._open[key] = w
+        return w
+
+    def write(self, df: pl.DataFrame) -> None:
+        """1 ページ分をパーティションに分けて、それぞれのファイルに書き足す。"""
+        if self._closed:
+            raise ValueError("write to a closed HivePartitionedWriter")
+        if not df.height:
+            return
+        self.rows += df.height
+        groups = df.partition_by(self.partition_by, as_dict=True, include_key=False, maintain_order=True)
+        for key, part in groups.items():
+            self._writer(key if isinstance(key, tuple) else (key,)).write(part)
+
+    def close(self) -> None:
+        """開いているファイルをすべて閉じる。"""
+        if self._closed:
+            return
+        self._closed = True
+        while self._open:
+            _, w = self._open.popitem(last=False)
+            w.close()
+
+    @property
+    def partitions(self) -> int:
+        """これまでに書いたパーティションの数。"""
+        return len(self._parts)
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import io
+import time
+import urllib.parse
+
+import pytest
+import requests
+import urllib3
+
+API_PREFIX = "https://api.jstage.jst.go.jp/"
+
+FEED_OPEN = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<feed xmlns="http://www.w3.org/2005/Atom" '
+    'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/" '
+    'xmlns:prism="http://prismstandard.org/namespaces/basic/2.0/" xml:lang="ja">\n'
+)
+
+
+def make_entry(i: int) -> str:
+    """i によって欠損・言語・型崩れのパターンを変えた entry を作る。"""
+    if i % 3 == 0:
+        title = f"<article_title><en><![CDATA[Title {i}]]></en><ja><![CDATA[題名 {i}]]></ja></article_title>"
+        authors = f"<author><en><name>Taro {i}</name><name>Hanako {i}</name></en><ja><name>太郎 {i}</name><name>花子 {i}</name></ja></author>"
+    elif i % 3 == 1:
+        title = f"<article_title><en>  Only English {i} </en><ja> </ja></article_title>"
+        authors = f"<author><name>Plain {i}</name></author>"
+    else:
+        title = "<article_title/>"
+        authors = ""
+    doi = f"<prism:doi>10.1234/x.{i}</prism:doi>" if i % 4 else ""
+    pages = (
+        f"<prism:startingPage>{i}</prism:startingPage><prism:endingPage>{i + 9}</prism:endingPage>"
+        if i % 5
+        else "<prism:startingPage>S1</prism:startingPage>"
+    )
+    return (
+        "<entry>"
+        f"<title>t{i}</title>"
+        f"{title}"
+        f"<article_link><en>https://example.org/en/{i}</en><ja>https://example.org/ja/{i}</ja></article_link>"
+        f"{authors}"
+        f"<cdjournal>jnl{i % 2}</cdjournal>"
+        f"<material_title><ja>雑誌 {i % 2}</ja></material_title>"
+        f"<prism:issn>1234-567{i % 2}</prism:issn>"
+        f"<prism:eIssn>8765-432{i % 2}</prism:eIssn>"
+        f"<prism:volume>{i % 7}</prism:volume>"
+        f"<cdvols> {i % 7}_{i % 3} </cdvols>"
+        f"<prism:number>{i % 4}</prism:number>"
+        f"{pages}"
+        f"<pubyear>{2000 + i % 10}</pubyear>"
+        f"{doi}"
+        "</entry>\n"
+    )
+
+
+def make_feed(ids, total: int | None, status: str = "0", report_total: bool = True) -> bytes:
+    """make_entry(i) を ids の順に並べた service=3 レスポンスを作る。"""
+    head = f"<result><status>{status}</status><message>msg</message></result>\n"
+    if total is not None and report_total:
+        head += f"<opensearch:totalResults>{total}</opensearch:totalResults>\n"
+    body = "".join(make_entry(i) for i in ids)
+    return (FEED_OPEN + head + body + "</feed>\n").encode("utf-8")
+
+
+def make_page(start: int, count: int, total: int | None, status: str = "0", report_total: bool = True) -> bytes:
+    """start から count 件（total で打ち切り）の service=3 レスポンスを作る。"""
+    last = start + count - 1 if total is None else min(start + count - 1, total)
+    return make_feed(range(start, last + 1), total, status, report_total)
+
+
+class FakeJStage(requests.adapters.BaseAdapter):
+    """totalResults 件を持つ J-STAGE を模した transport adapter。"""
+
+    def __init__(self, total: int, status: str = "0", delay=None, fail=None, report_total: bool = True) -> None:
+        super().__init__()
+        self.total = total
+        self.status = status
+        self.report_total = report_total  # False なら totalResults をレスポンスに載せない
+        self.delay = delay  # start -> 応答までの秒数（並行取得の順序テスト用）
+        self.fail = fail  # start -> 返す HTTP ステータスか (ステータス, ヘッダ)（None なら正常応答）
+        self.calls: list[dict[str, str]] = []
+
+    def send(self, request, **kwargs):
+        q = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(request.url).query))
+        self.calls.append(q)
+        start, count = int(q["start"]), int(q["count"])
+        if self.delay is not None:
+            time.sleep(self.delay(start))
+        code = self.fail(start) if self.fail is not None else None
+        headers = {}
+        if isinstance(code, tuple):
+            code, headers = code
+        if code is not None:
+            body = b"error"
+        elif self.status != "0":
+            body = make_page(start, 0, None, status=self.status)
+        elif "pubyearto" in q:
+            # make_entry(i) の pubyear は 2000 + i % 10。年の範囲で絞ってから start/count で切る
+            lo, hi = int(q["pubyearfrom"]), int(q["pubyearto"])
+            ids = [i for i in range(1, self.total + 1) if lo <= 2000 + i % 10 <= hi]
+            body = make_feed(ids[start - 1 : start - 1 + count], len(ids), report_total=self.report_total)
+        else:
+            body = make_page(start, count, self.total, report_total=self.report_total)
+
+        r = requests.Response()
+        r.status_code = code or 200
+        r.url = request.url
+        r.request = request
+        r.raw = urllib3.HTTPResponse(body=io.BytesIO(body), preload_content=False)
+        r.headers["Content-Type"] = "application/xml"
+        r.headers.update(headers)
+        return r
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def fake_session():
+    def make(total: int, **kwargs) -> requests.Session:
+        s = requests.Session()
+        adapter = FakeJStage(total, **kwargs)
+        s.mount(API_PREFIX, adapter)
+        s.adapter = adapter  # テストから呼び出し履歴を見るため
+        return s
+
+    return make
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+import io
+
+import urllib3
+from conftest import make_page
+
+from j_staget import afetch, aiter_pages, fetch
+
+
+def test_afetch_matches_fetch(fake_session):
+    expected = fetch("x", step=10, max_records=45, sleep=0, session=fake_session(95))
+    # 後ろのページほど早く返るようにして、start 順に組み立て直されることを確かめる
+    s = fake_session(95, delay=lambda start: 0.05 if start < 30 else 0.0)
+    res = asyncio.run(afetch("x", step=10, max_records=45, sleep=0, session=s, concurrency=5))
+    assert res.total_results == 95
+    assert res.df.equals(expected.df)
+    assert sorted(int(c["start"]) for c in s.adapter.calls) == [1, 11, 21, 31, 41]
+
+
+def test_afetch_follows_plan(fake_session):
+    s = fake_session(95)
+    res = asyncio.run(afetch("x", step=10, max_records=21, sleep=0, session=s))
+    assert res.df.height == 21
+    assert sorted((int(c["start"]), int(c["count"])) for c in s.adapter.calls) == [(1, 10), (11, 10), (21, 1)]
+
+
+def test_aiter_pages_yields_each_page(fake_session):
+    async def collect():
+        return [df.height async for df in aiter_pages("x", step=10, sleep=0, session=fake_session(25))]
+
+    assert asyncio.run(collect()) == [10, 10, 5]
+
+
+def test_afetch_no_results(fake_session):
+    res = asyncio.run(afetch("x", sleep=0, session=fake_session(0, status="ERR_001")))
+    assert res.total_results == 0
+    assert res.df.is_empty()
+
+
+def test_afetch_err_001_on_later_window(fake_session):
+    # 途中の窓が ERR_001 を返したら、fetch と同じく 0 件
+    def session():
+        s = fake_session(45)
+        real = s.adapter.send
+
+        def send(request, **kwargs):
+            r = real(request, **kwargs)
+            if "start=21" in request.url:
+                r.raw = urllib3.HTTPResponse(body=io.BytesIO(make_page(21, 0, None, status="ERR_001")), preload_content=False)
+            return r
+
+        s.adapter.send = send
+        return s
+
+    expected = fetch("x", step=10, sleep=0, session=session())
+    res = asyncio.run(afetch("x", step=10, sleep=0, session=session(), concurrency=3))
+    assert (expected.total_results, expected.df.height) == (0, 0)
+    assert (res.total_results, res.df.height) == (0, 0)
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import polars as pl
+import pytest
+
+from j_staget import JStageAPIError, cli, fetch, fetch_many
+
+
+def test_fetch_many_shares_session(fake_session):
+    s = fake_session(35)
+    done = []
+    results = fetch_many(
+        [{"target_word": "a", "step": 10}, {"target_word": "b", "max_records": 12, "step": 10}],
+        session=s,
+        sleep=0,
+        on_result=lambda i, r: done.append(i),
+    )
+    assert [r.df.height for r in results] == [35, 12]
+    assert results[0].df.equals(fetch("a", step=10, sleep=0, session=fake_session(35)).df)
+    assert sorted(done) == [0, 1]
+    assert sorted(c.get("article") for c in s.adapter.calls) == ["a"] * 4 + ["b"] * 2
+
+
+def test_fetch_many_errors(fake_session):
+    s = fake_session(15, fail=lambda start: 404 if start == 11 else None)
+    jobs = [{"target_word": "a", "step": 10}, {"target_word": "b", "max_records": 5}]
+    with pytest.raises(JStageAPIError):
+        fetch_many(jobs, session=s, sleep=0)
+
+    results = fetch_many(jobs, session=s, sleep=0, return_exceptions=True)
+    assert isinstance(results[0], JStageAPIError)
+    assert results[1].df.height == 5
+
+    with pytest.raises(ValueError):
+        fetch_many([{"target_word": "a", "sleep": 1}])
+
+
+def test_cli_run(fake_session, monkeypatch, tmp_path, capsys):
+    s = fake_session(25)
+    monkeypatch.setattr("j_staget._batch._pooled_session", lambda size: s)
+    manifest = tmp_path / "jobs.toml"
+    manifest.write_text(
+        """
+workers = 2
+sleep = 0
+
+[defaults]
+step = 10
+
+[[jobs]]
+query = "因果"
+out = "out/a.parquet"
+
+[[jobs]]
+cdjournal = "jnl"
+max_records = 7
+out = "out/b.csv"
+""",
+        encoding="utf-8",
+    )
+    assert cli.main(["run", str(manifest)]) == 0
+    assert pl.read_parquet(tmp_path / "out/a.parquet").height == 25
+    assert pl.read_csv(tmp_path / "out/b.csv").height == 7
+    assert len(capsys.readouterr().out.splitlines()) == 2
+
+    manifest.write_text('[[jobs]]\nquery = "x"\nout = "a.txt"\n', encoding="utf-8")
+    with pytest.raises(SystemExit):
+        cli.main(["run", str(manifest)])
+
+
+
+@pytest.mark.parametrize("argv", [["run"], ["--", "run"], ["run", "--year", "2000"]])
+def test_cli_run_without_manifest_is_a_keyword(fake_session, monkeypatch, capsys, argv):
+    import j_staget.client
+
+    real = j_staget.client.fetch
+    queries = []
+
+    def fetch(query, **kwargs):
+        queries.append(query)
+        return real(query, **{**kwargs, "sleep": 0, "session": fake_session(3)})
+
+    monkeypatch.setattr(j_staget.client, "fetch", fetch)
+    assert cli.main(argv) == 0
+    assert queries == ["run"]
+    assert capsys.readouterr().out.strip() == "rows=3 total_results=3"
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import os
+import time
+
+import pytest
+
+from j_staget import PageCache, ResponseCache, ResultCache, fetch
+from j_staget.cache import canonical_url
+
+URL = "https://api.jstage.jst.go.jp/searchapi/do?service=3&article=x&start=1&count=10"
+
+
+def test_canonical_url():
+    a = canonical_url("HTTPS://API.jstage.jst.go.jp/searchapi/do?start=1&count=10&article=%E5%9B%A0")
+    b = canonical_url("https://api.jstage.jst.go.jp/searchapi/do?article=%E5%9B%A0&count=10&start=1")
+    assert a == b
+    assert a != canonical_url("https://api.jstage.jst.go.jp/searchapi/do?article=%E5%9B%A0&count=10&start=11")
+
+
+def test_put_get_and_ttl(tmp_path):
+    cache = ResponseCache(tmp_path, ttl=60)
+    assert cache.get(URL) is None
+    cache.put(URL, b"<feed/>" * 100, {"ETag": '"v1"'})
+    assert cache.get(URL) == b"<feed/>" * 100
+    assert cache.lookup(URL).etag == '"v1"'
+    # 圧縮して保存する
+    assert cache.size() < 700
+
+    expired = ResponseCache(tmp_path, ttl=0)
+    assert expired.get(URL) is None
+    assert expired.lookup(URL) is not None
+
+
+def test_lru_eviction(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=10_000, level=0)
+    urls = [URL.replace("start=1", f"start={i}") for i in range(4)]
+    for i, url in enumerate(urls[:3]):
+        cache.put(url, os.urandom(3000))
+        past = time.time() - 100 + i
+        os.utime(cache._path(canonical_url(url)), (past, past))
+    # urls[0] を使うと、次に追い出されるのは urls[1]
+    cache.get(urls[0])
+    cache.put(urls[3], os.urandom(3000))
+    assert cache.size() <= 10_000
+    assert cache.get(urls[0]) is not None
+    assert cache.get(urls[1]) is None
+    assert cache.get(urls[3]) is not None
+
+
+def test_put_does_not_scan_until_over_budget(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path, max_bytes=10_000, level=0)
+    urls = [URL.replace("start=1", f"start={i}") for i in range(5)]
+    cache.put(urls[0], b"x" * 3000)  # 初回はディレクトリを数えて合計を記録する
+    monkeypatch.setattr(cache, "_entries", lambda: pytest.fail("scanned the cache directory"))
+    cache.put(urls[1], b"x" * 3000)
+    cache.put(urls[1], b"y" * 3000)  # 上書きは差分だけ足す
+    monkeypatch.undo()
+    assert int((tmp_path / ".lock").read_text()) == cache.size()
+
+    for u in urls[2:]:
+        cache.put(u, b"x" * 3000)
+    assert cache.size() <= 10_000
+    assert int((tmp_path / ".lock").read_text()) == cache.size()
+    cache.clear()
+    assert (tmp_path / ".lock").read_text() == "0"
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_fetch_replays_from_cache(fake_session, tmp_path, stream):
+    cache = ResponseCache(tmp_path)
+    s = fake_session(25)
+    first = fetch("x", step=10, sleep=0, session=s, cache=cache, stream=stream)
+    assert len(s.adapter.calls) == 3
+
+    s = fake_session(25)
+    again = fetch("x", step=10, sleep=60, session=s, cache=cache, stream=stream)
+    assert s.adapter.calls == []
+    assert again.df.equals(first.df)
+    assert again.total_results == 25
+
+
+def test_error_pages_are_not_cached(fake_session, tmp_path):
+    cache = ResponseCache(tmp_path)
+    fetch("x", sleep=0, session=fake_session(0, status="ERR_001"), cache=cache)
+    assert cache.size() == 0
+
+
+def test_page_cache_skips_request_and_parse(fake_session, monkeypatch):
+    pages = PageCache()
+    first = fetch("x", step=10, max_records=25, sleep=0, session=fake_session(95), page_cache=pages)
+    assert pages.info().misses == 3 and pages.info().entries == 3
+
+    import j_staget.client
+
+    def no_parse(*args, **kwargs):
+        raise AssertionError("parsed again")
+
+    monkeypatch.setattr(j_staget.client, "parse_page", no_parse)
+    monkeypatch.setattr(j_staget.client, "_get_page_once", no_parse)
+    again = fetch("x", step=10, max_records=25, sleep=60, session=fake_session(95), page_cache=pages)
+    assert again.df.equals(first.df)
+    info = pages.info()
+    assert (info.hits, info.misses) == (3, 3)
+
+
+def test_page_cache_overlapping_fetch(fake_session):
+    pages = PageCache()
+    fetch("x", step=10, max_records=20, sleep=0, session=fake_session(95), page_cache=pages)
+    s = fake_session(95)
+    res = fetch("x", step=10, max_records=40, sleep=0, session=s, page_cache=pages)
+    assert res.df.height == 40
+    assert [c["start"] for c in s.adapter.calls] == ["21", "31"]
+
+
+def test_page_cache_evicts_by_bytes(fake_session):
+    one = fetch("x", step=10, max_records=10, sleep=0, session=fake_session(95)).df.estimated_size()
+    pages = PageCache(max_bytes=int(one * 2.5))
+    fetch("x", step=10, max_records=40, sleep=0, session=fake_session(95), page_cache=pages)
+    info = pages.info()
+    assert info.entries == 2
+    assert info.bytes <= info.max_bytes
+    # 残っているのは最後の 2 ページ
+    page = "https://api.jstage.jst.go.jp/searchapi/do?service=3&pubyearfrom=1950&article=x&count=10&start={}"
+    assert pages.get(page.format(31)) is not None
+    assert pages.get(page.format(21)) is not None
+    assert pages.get(page.format(1)) is None
+
+
+@pytest.mark.parametrize("parser", ["lxml", "iterparse", "expat"])
+def test_corrupt_cached_page_is_fetched_again(fake_session, tmp_path, parser):
+    from j_staget._query import _build_params, _page_url
+
+    cache = ResponseCache(tmp_path)
+    params = _build_params(
+        "x", year=1950, year_to=None, field="article", material=None, author=None, affil=None, issn=None, cdjournal=None
+    )
+    cache.put(_page_url(params, 1, 10), b"<feed><entry")
+    s = fake_session(5)
+    res = fetch("x", step=10, sleep=0, session=s, cache=cache, parser=parser)
+    assert res.df.height == 5
+    assert len(s.adapter.calls) == 1
+
+
+def test_result_cache(fake_session, tmp_path):
+    s = fake_session(25)
+    first = fetch("x", step=10, sleep=0, session=s, result_cache=tmp_path)
+    assert len(s.adapter.calls) == 3
+
+    s = fake_session(25)
+    again = fetch("x", step=10, sleep=60, session=s, result_cache=tmp_path)
+    assert s.adapter.calls == []
+    assert again.df.equals(first.df)
+    assert again.total_results == 25
+
+    # max_records が違えば別のキー
+    s = fake_session(25)
+    assert fetch("x", step=10, max_records=5, sleep=0, session=s, result_cache=tmp_path).df.height == 5
+    assert len(s.adapter.calls) == 1
+
+
+def test_result_cache_invalidation(fake_session, tmp_path):
+    from j_staget._query import _build_params
+
+    fetch("x", step=10, sleep=0, session=fake_session(25), result_cache=tmp_path)
+
+    # 古すぎるものは使わない
+    s = fake_session(25)
+    fetch("x", step=10, sleep=0, session=s, result_cache=ResultCache(tmp_path, max_age=0))
+    assert len(s.adapter.calls) == 3
+
+    # キーを指定して消す
+    cache = ResultCache(tmp_path)
+    params = _build_params(
+        "x", year=1950, year_to=None, field="article", material=None, author=None, affil=None, issn=None, cdjournal=None
+    )
+    key = ResultCache.key(params, 20000)
+    assert cache.get(key) is not None
+    # 書きかけ・壊れた Parquet は「無い」ものとして扱う
+    data = tmp_path / f"{key}.parquet"
+    saved = data.read_bytes()
+    data.write_bytes(saved[: len(saved) // 2])
+    assert cache.get(key) is None
+    data.write_bytes(saved)
+    cache.invalidate(key)
+    assert cache.get(key) is None
+
+    fetch("y", step=10, sleep=0, session=fake_session(25), result_cache=cache)
+    cache.invalidate()
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+from j_staget import JStageAPIError, JStageQueryError, cli, count
+
+
+def test_count_reads_header_only(fake_session):
+    s = fake_session(12345)
+    assert count("x", session=s) == 12345
+    assert s.adapter.calls == [{"service": "3", "pubyearfrom": "1950", "article": "x", "start": "1", "count": "1"}]
+
+
+def test_count_statuses(fake_session):
+    assert count("x", session=fake_session(0, status="ERR_001")) == 0
+    with pytest.raises(JStageQueryError):
+        count("x", session=fake_session(0, status="ERR_012"))
+
+
+def test_count_malformed_response(fake_session, monkeypatch):
+    # HTTP 200 で XML でない本文
+    with pytest.raises(JStageAPIError):
+        count("x", session=fake_session(5, fail=lambda start: 200))
+
+    import conftest
+
+    # 数値でない totalResults
+    real = conftest.make_page
+    monkeypatch.setattr(
+        conftest, "make_page", lambda *a, **kw: real(*a, **kw).replace(b">5</opensearch", b">many</opensearch")
+    )
+    with pytest.raises(JStageAPIError):
+        count("x", session=fake_session(5))
+
+
+def test_cli_count_only(fake_session, monkeypatch, capsys):
+    s = fake_session(77)
+    monkeypatch.setattr(cli, "count", lambda *a, **kw: count(*a, session=s, **kw))
+    assert cli.main(["x", "--count-only"]) == 0
+    assert capsys.readouterr().out.strip() == "total_results=77"
+
+
+def test_count_does_not_import_polars():
+    code = (
+        "import sys, j_staget, j_staget.cli; "
+        "assert callable(j_staget.count); "
+        "assert 'polars' not in sys.modules, 'polars imported'"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import pytest
+
+from j_staget import fetch
+
+
+@pytest.mark.parametrize("parser", ["lxml", "iterparse", "expat"])
+@pytest.mark.parametrize("stream", [False, True])
+def test_fetch_pages(fake_session, parser, stream):
+    s = fake_session(25)
+    res = fetch("x", step=10, sleep=0, session=s, parser=parser, stream=stream)
+    assert res.total_results == 25
+    assert res.df.height == 25
+    assert [c["start"] for c in s.adapter.calls] == ["1", "11", "21"]
+
+
+def test_plan_pages():
+    from j_staget._query import plan_pages
+
+    assert plan_pages(1, 2001, 1000) == [(1, 1000), (1001, 1000), (2001, 1)]
+    assert plan_pages(11, 25, 10) == [(11, 10), (21, 5)]
+    assert plan_pages(11, 10, 10) == []
+
+
+def test_page_plan():
+    from j_staget._query import PagePlan
+
+    plan = PagePlan(max_records=25, step=10)
+    assert plan.next_page() == (1, 10)
+    plan.record(10, 95, 10)
+    # totalResults が分かったら逐次の段階は終わり、残りは窓で取る
+    assert plan.next_page() is None
+    assert plan.windows() == [(11, 10), (21, 5)]
+
+    # totalResults が無ければ、要求より少ないページで終わる
+    plan = PagePlan(max_records=100, step=10)
+    assert plan.next_page() == (1, 10)
+    plan.record(10, None, 10)
+    assert plan.next_page() == (11, 10)
+    plan.record(10, None, 3)
+    assert plan.next_page() is None and plan.windows() == []
+
+
+def _windows(s):
+    return sorted((int(c["start"]), int(c["count"])) for c in s.adapter.calls)
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_fetch_never_over_requests(fake_session, workers):
+    # max_records で打ち切り：最後の窓は残り件数ちょうど
+    s = fake_session(95)
+    res = fetch("x", step=10, max_records=21, sleep=0, session=s, workers=workers)
+    assert res.df.height == 21
+    assert _windows(s) == [(1, 10), (11, 10), (21, 1)]
+
+    # totalResults で打ち切り
+    s = fake_session(25)
+    fetch("x", step=10, sleep=0, session=s, workers=workers)
+    assert _windows(s) == [(1, 10), (11, 10), (21, 5)]
+
+    # 最初のページも max_records を超えて要求しない
+    s = fake_session(95)
+    assert fetch("x", step=10, max_records=3, sleep=0, session=s, workers=workers).df.height == 3
+    assert _windows(s) == [(1, 3)]
+
+
+def test_fetch_without_total_stops_on_short_page(fake_session):
+    s = fake_session(25, report_total=False)
+    res = fetch("x", step=10, sleep=0, session=s)
+    assert res.df.height == 25
+    assert res.total_results == 25
+    assert _windows(s) == [(1, 10), (11, 10), (21, 10)]
+
+
+def test_parsers_agree(fake_session):
+    a = fetch("x", step=10, max_records=17, sleep=0, session=fake_session(25))
+    b = fetch("x", step=10, max_records=17, sleep=0, session=fake_session(25), parser="iterparse")
+    assert a.df.height == 17
+    assert a.df.equals(b.df)
+
+
+def test_err_001_returns_empty(fake_session):
+    res = fetch("x", sleep=0, session=fake_session(0, status="ERR_001"), parser="iterparse")
+    assert res.total_results == 0
+    assert res.df.is_empty()
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_err_codes_raise_typed_errors(fake_session, stream):
+    from j_staget import JStageAPIError, JStageQueryError, JStageServerError
+
+    with pytest.raises(JStageQueryError) as ei:
+        fetch("x", sleep=0, session=fake_session(0, status="ERR_012"), stream=stream)
+    assert ei.value.code == "ERR_012"
+    assert ei.value.message == "msg"
+    with pytest.raises(JStageServerError):
+        fetch("x", sleep=0, session=fake_session(0, status="ERR_999"), stream=stream)
+    with pytest.raises(JStageAPIError):
+        fetch("x", sleep=0, session=fake_session(0, status="ERR_555"), stream=stream)
+
+
+def test_unlisted_err_codes_are_not_query_errors():
+    from j_staget import JStageQueryError, JStageResultError
+    from j_staget._errors import error_for
+
+    assert type(error_for("ERR_002")) is JStageQueryError
+    for code in ("ERR_000", "ERR_013", "ERR_100"):
+        assert type(error_for(code)) is JStageResultError
+
+
+def test_workers_match_sequential(fake_session):
+    expected = fetch("x", step=10, max_records=55, sleep=0, session=fake_session(95))
+    s = fake_session(95, delay=lambda start: 0.05 if start < 30 else 0.0)
+    res = fetch("x", step=10, max_records=55, sleep=0, session=s, workers=4)
+    assert res.total_results == 95
+    assert res.df.equals(expected.df)
+    assert sorted(int(c["start"]) for c in s.adapter.calls) == [1, 11, 21, 31, 41, 51]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_checkpoint_resume_after_failure(fake_session, tmp_path, workers):
+    from j_staget import JStageAPIError
+
+    expected = fetch("x", step=10, sleep=0, session=fake_session(45))
+
+    broken = fake_session(45, fail=lambda start: 503 if start == 31 else None)
+    with pytest.raises(JStageAPIError):
+        fetch("x", step=10, sleep=0, session=broken, checkpoint_dir=tmp_path, workers=workers)
+
+    s = fake_session(45)
+    res = fetch("x", step=10, sleep=0, session=s, checkpoint_dir=tmp_path, resume=True, workers=workers)
+    assert sorted(c["start"] for c in s.adapter.calls) == ["31", "41"]
+    assert res.total_results == 45
+    assert res.df.equals(expected.df)
+
+    # 完了済みなら再取得しない
+    s = fake_session(45)
+    res = fetch("x", step=10, sleep=0, session=s, checkpoint_dir=tmp_path, resume=True)
+    assert s.adapter.calls == []
+    assert res.df.equals(expected.df)
+
+
+def test_checkpoint_rejects_other_query(fake_session, tmp_path):
+    fetch("x", step=10, sleep=0, session=fake_session(15), checkpoint_dir=tmp_path)
+    with pytest.raises(ValueError):
+        fetch("y", step=10, sleep=0, session=fake_session(15), checkpoint_dir=tmp_path, resume=True)
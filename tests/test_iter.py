@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import polars as pl
+import pytest
+
+from j_staget import fetch, iter_pages, iter_records
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_iter_pages_matches_fetch(fake_session, workers):
+    expected = fetch("x", step=10, max_records=45, sleep=0, session=fake_session(95))
+    pages = list(iter_pages("x", step=10, max_records=45, sleep=0, session=fake_session(95), workers=workers))
+    assert [df.height for df in pages] == [10, 10, 10, 10, 5]
+    assert pl.concat(pages).equals(expected.df)
+
+
+def test_iter_pages_is_lazy(fake_session):
+    s = fake_session(95)
+    pages = iter_pages("x", step=10, sleep=0, session=s)
+    assert s.adapter.calls == []
+    assert next(pages).height == 10
+    assert len(s.adapter.calls) == 1
+
+
+def test_read_ahead_is_bounded(fake_session):
+    s = fake_session(200)
+    pages = iter_pages("x", step=10, max_records=200, sleep=0, session=s, workers=2)
+    next(pages)
+    next(pages)
+    # 1 ページ目 + 先読み workers * 2 ページ + 消費で補充した 1 ページ
+    assert len(s.adapter.calls) <= 1 + 4 + 1
+    pages.close()
+
+
+def test_iter_records(fake_session):
+    expected = fetch("x", step=10, sleep=0, session=fake_session(25)).df
+    rows = list(iter_records("x", step=10, sleep=0, session=fake_session(25)))
+    assert rows == expected.to_dicts()
+    assert next(iter_records("x", named=False, step=10, sleep=0, session=fake_session(25))) == expected.row(0)
+
+
+def test_iter_pages_validates_on_call():
+    with pytest.raises(ValueError):
+        iter_pages("x", max_records=0)
+    with pytest.raises(ValueError):
+        iter_records("x", resume=True)
+
+
+def test_iter_pages_no_results(fake_session):
+    assert list(iter_pages("x", sleep=0, session=fake_session(0, status="ERR_001"))) == []
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import pytest
+from conftest import FEED_OPEN, make_page
+from test_xml import EDGE_ENTRIES
+
+from j_staget._columns import ColumnBuilder
+from j_staget._parsers import PARSE_ERRORS, PARSERS, resolve_parser
+
+PAGES = {
+    "normal": make_page(1, 40, 123),
+    "last": make_page(121, 40, 123),
+    "no_total": make_page(1, 5, None),
+    "err_001": make_page(1, 0, None, status="ERR_001"),
+    "edge": (FEED_OPEN + "<!-- c --><opensearch:totalResults> 6 </opensearch:totalResults>"
+             + "".join(EDGE_ENTRIES) + "</feed>").encode(),
+}
+
+
+def _run(name: str, content: bytes, chunk: int, max_rows: int = 10**9):
+    rows = ColumnBuilder()
+    p = PARSERS[name](rows, max_rows)
+    for i in range(0, len(content), chunk):
+        p.feed(content[i : i + chunk])
+    return p.close(), rows.to_frame()
+
+
+@pytest.mark.parametrize("name", sorted(PARSERS))
+@pytest.mark.parametrize("page", sorted(PAGES))
+@pytest.mark.parametrize("chunk", [7, 1 << 20])
+def test_backend_conformance(name, page, chunk):
+    pytest.importorskip("lxml")
+    expected_info, expected = _run("lxml", PAGES[page], 1 << 20)
+    info, df = _run(name, PAGES[page], chunk)
+    assert info == expected_info
+    assert df.equals(expected)
+
+
+@pytest.mark.parametrize("name", sorted(PARSERS))
+def test_backend_respects_max_rows(name):
+    info, df = _run(name, PAGES["normal"], 4096, max_rows=3)
+    assert info.entries == 40
+    assert info.total_results == 123
+    assert df.height == 3
+
+
+def test_probe_header_stops_before_entries():
+    from j_staget._header import HeaderProbe
+
+    probe = HeaderProbe()
+    # 最初の entry の途中までしか渡さなくてもヘッダは確定する
+    content = PAGES["normal"]
+    assert probe.feed(content[: content.index(b"<entry>") + 20])
+    h = probe.close()
+    assert (h.status, h.message, h.total_results) == ("0", "msg", 123)
+    assert not h.is_error
+
+
+def test_default_backend_parses_while_feeding():
+    # auto のバックエンドはページ全体を溜めず、届いたチャンクをその場でパースする
+    pytest.importorskip("lxml")
+    content = PAGES["normal"]
+    second = content.index(b"<entry>", content.index(b"<entry>") + 1)
+    p = resolve_parser("auto")(ColumnBuilder(), 10**9)
+    p.feed(content[:second])
+    assert p.header_done
+    with pytest.raises(PARSE_ERRORS):
+        p.feed(b"</broken>")
+
+
+@pytest.mark.parametrize("name", ["lxml", "iterparse"])
+def test_lxml_backend_without_lxml_fails_before_any_request(fake_session, monkeypatch, name):
+    from j_staget import fetch
+
+    monkeypatch.setattr("j_staget._parsers.has_lxml", lambda: False)
+    s = fake_session(5)
+    with pytest.raises(ImportError, match="requires lxml"):
+        fetch("x", parser=name, sleep=0, session=s)
+    assert s.adapter.calls == []
+    assert resolve_parser("auto") is PARSERS["expat"]
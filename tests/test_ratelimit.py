@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import pytest
+
+from j_staget import FileRateLimiter, RateLimiter
+
+
+def test_token_bucket_burst_then_refill_rate():
+    lim = RateLimiter(rate=10, burst=2)
+    assert lim.reserve() == 0
+    assert lim.reserve() == 0
+    # バケツが空なので 3 つ目以降は 1/rate 秒ずつ後ろに並ぶ
+    assert lim.reserve() == pytest.approx(0.1, abs=0.02)
+    assert lim.reserve() == pytest.approx(0.2, abs=0.02)
+
+
+def test_from_interval():
+    assert RateLimiter.from_interval(0).reserve() == 0
+    lim = RateLimiter.from_interval(5.0)
+    assert lim.reserve() == 0
+    assert lim.reserve() == pytest.approx(5.0, abs=0.05)
+
+
+def test_file_rate_limiter_is_shared_through_the_file(tmp_path):
+    path = tmp_path / "jstage.lock"
+    a = FileRateLimiter(path, rate=0.2)
+    b = FileRateLimiter(path, rate=0.2)
+    assert a.reserve() == 0
+    assert b.reserve() == pytest.approx(5.0, abs=0.5)
+    assert a.reserve() == pytest.approx(10.0, abs=0.5)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import email.utils
+import time
+
+import pytest
+import requests
+
+from j_staget import JStageAPIError, RetryPolicy, fetch
+from j_staget.retry import _retry_after
+
+NO_WAIT = RetryPolicy(max_attempts=3, backoff=0, jitter=0)
+
+
+def flaky(codes: dict[int, list]):
+    """start ごとに、最初の数回だけ codes の応答を返す fail 関数。"""
+
+    def fail(start: int):
+        queue = codes.get(start)
+        return queue.pop(0) if queue else None
+
+    return fail
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_retry_refetches_only_failed_page(fake_session, workers):
+    expected = fetch("x", step=10, sleep=0, session=fake_session(45))
+    s = fake_session(45, fail=flaky({21: [503, 502]}))
+    res = fetch("x", step=10, sleep=0, session=s, retry=NO_WAIT, workers=workers)
+    assert res.df.equals(expected.df)
+    assert sorted(int(c["start"]) for c in s.adapter.calls) == [1, 11, 21, 21, 21, 31, 41]
+
+
+def test_retry_gives_up_after_max_attempts(fake_session):
+    s = fake_session(45, fail=flaky({11: [503] * 5}))
+    with pytest.raises(JStageAPIError):
+        fetch("x", step=10, sleep=0, session=s, retry=NO_WAIT)
+    assert [int(c["start"]) for c in s.adapter.calls] == [1, 11, 11, 11]
+
+
+def test_no_retry_on_client_error(fake_session):
+    s = fake_session(45, fail=flaky({11: [404]}))
+    with pytest.raises(JStageAPIError):
+        fetch("x", step=10, sleep=0, session=s, retry=NO_WAIT)
+    assert [int(c["start"]) for c in s.adapter.calls] == [1, 11]
+
+
+def test_retry_after_is_honoured(fake_session, monkeypatch):
+    waits: list[float] = []
+    monkeypatch.setattr("j_staget.retry.time.sleep", waits.append)
+    s = fake_session(15, fail=flaky({11: [(429, {"Retry-After": "7"})]}))
+    res = fetch("x", step=10, sleep=0, session=s, retry=NO_WAIT)
+    assert res.df.height == 15
+    assert waits == [7.0]
+
+
+def _error(status: int, retry_after: str | None) -> requests.HTTPError:
+    r = requests.Response()
+    r.status_code = status
+    if retry_after is not None:
+        r.headers["Retry-After"] = retry_after
+    return requests.HTTPError(response=r)
+
+
+def test_delay():
+    p = RetryPolicy(backoff=1, multiplier=2, max_backoff=5, jitter=0)
+    assert [p.delay(n) for n in range(1, 5)] == [1, 2, 4, 5]
+    assert p.delay(1, _error(503, "30")) == 30
+    # 500 の Retry-After は見ない
+    assert p.delay(1, _error(500, "30")) == 1
+
+    date = email.utils.formatdate(time.time() + 60, usegmt=True)
+    assert 55 < _retry_after(_error(503, date)) <= 60
+    assert _retry_after(_error(503, "soon")) is None
+
+    jittered = RetryPolicy(backoff=10, jitter=0.5)
+    assert all(5 <= jittered.delay(1) <= 15 for _ in range(50))
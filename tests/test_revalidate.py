@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from conftest import make_page
+
+from j_staget import PageCache, ResponseCache, fetch
+
+
+class StandIn:
+    """ETag/Last-Modified を返し、条件付きリクエストに 304 で答える J-STAGE の代わり。"""
+
+    LAST_MODIFIED = "Mon, 01 Jan 2024 00:00:00 GMT"
+
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self.version = 1
+        self.statuses: list[int] = []
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                q = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(self.path).query))
+                start, count = int(q["start"]), int(q["count"])
+                etag = f'"v{stand_in.version}-{start}-{count}"'
+                if self.headers.get("If-None-Match") == etag:
+                    stand_in.statuses.append(304)
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                body = make_page(start, count, stand_in.total)
+                stand_in.statuses.append(200)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/xml")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", stand_in.LAST_MODIFIED)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/searchapi/do"
+
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    s = StandIn(25)
+    thread = threading.Thread(target=s.server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr("j_staget._query.API_URL", s.url)
+    yield s
+    s.server.shutdown()
+    s.server.server_close()
+
+
+@pytest.mark.parametrize("layer", ["disk", "memory", "both"])
+def test_expired_pages_are_revalidated(stand_in, tmp_path, layer):
+    kw = {}
+    if layer in ("disk", "both"):
+        kw["cache"] = ResponseCache(tmp_path, ttl=0)
+    if layer in ("memory", "both"):
+        kw["page_cache"] = PageCache(ttl=0)
+
+    first = fetch("x", step=10, sleep=0, **kw)
+    assert stand_in.statuses == [200, 200, 200]
+
+    # 期限切れなので問い合わせるが、変わっていないので 304 で手元のページを使う
+    stand_in.statuses.clear()
+    again = fetch("x", step=10, sleep=0, **kw)
+    assert stand_in.statuses == [304, 304, 304]
+    assert again.df.equals(first.df)
+    assert again.total_results == 25
+    if "page_cache" in kw:
+        assert kw["page_cache"].info().revalidated == 3
+
+    # 内容が変わったら 200 で取り直す
+    stand_in.statuses.clear()
+    stand_in.version = 2
+    stand_in.total = 15
+    changed = fetch("x", step=10, sleep=0, **kw)
+    assert stand_in.statuses == [200, 200]
+    assert changed.df.height == 15
+
+
+def test_fresh_pages_are_not_revalidated(stand_in, tmp_path):
+    cache = ResponseCache(tmp_path, ttl=3600)
+    fetch("x", step=10, sleep=0, cache=cache)
+    stand_in.statuses.clear()
+    fetch("x", step=10, sleep=0, cache=cache)
+    assert stand_in.statuses == []
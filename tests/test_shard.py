@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import polars as pl
+
+from j_staget import count, fetch, fetch_sharded
+from j_staget._shard import Shard, _dedupe, _plan_shards
+
+
+def test_year_to(fake_session):
+    s = fake_session(100)
+    # pubyear は 2000..2009 が 10 件ずつ
+    assert count("x", year=2002, year_to=2004, session=s) == 30
+    res = fetch("x", year=2002, year_to=2004, step=7, sleep=0, session=s)
+    assert res.total_results == 30
+    assert res.df["pubyear"].is_between(2002, 2004).all()
+    assert s.adapter.calls[0]["pubyearto"] == "2004"
+
+
+def test_plan_shards_splits_until_small():
+    sizes = {y: 10 for y in range(2000, 2010)}
+    sizes[2003] = 50
+    calls = []
+
+    def probe(lo, hi):
+        calls.append((lo, hi))
+        return sum(sizes.get(y, 0) for y in range(lo, hi + 1))
+
+    shards = _plan_shards(probe, 1998, 2009, 25)
+    assert all(s.total <= 25 or s.year == s.year_to for s in shards)
+    assert Shard(2003, 2003, 50) in shards
+    assert sum(s.total for s in shards) == sum(sizes.values())
+    assert [s.year for s in shards] == sorted(s.year for s in shards)
+    # 右半分は引き算で求めるので、分割 1 回につき probe は 1 回
+    assert len(calls) == len(set(calls)) < 2 * len(shards)
+
+    # 0 件の範囲はシャードにしない
+    assert _plan_shards(lambda lo, hi: 0, 1990, 2000, 25) == []
+
+
+def test_fetch_sharded_matches_fetch(fake_session):
+    expected = fetch("x", year=2000, year_to=2009, sleep=0, session=fake_session(95))
+    s = fake_session(95)
+    res = fetch_sharded("x", year=2000, year_to=2009, shard_size=20, step=7, sleep=0, session=s, workers=3)
+    assert res.total_results == 95
+    assert res.df.height == 95
+    key = ["pubyear", "article_link"]
+    assert res.df.sort(key).equals(expected.df.sort(key))
+    # シャードは 20 件以下（= 2 年以下）で、2000..2009 を隙間なく覆う
+    shards = sorted({(int(c["pubyearfrom"]), int(c["pubyearto"])) for c in s.adapter.calls if c["count"] != "1"})
+    assert all(hi - lo <= 1 for lo, hi in shards)
+    assert [lo for lo, _ in shards[1:]] == [hi + 1 for _, hi in shards[:-1]]
+    assert (shards[0][0], shards[-1][1]) == (2000, 2009)
+    # 結果は年の昇順（シャード順）
+    assert res.df["pubyear"].head(19).is_between(shards[0][0], shards[0][1]).all()
+
+
+def test_dedupe():
+    df = pl.DataFrame(
+        {
+            "doi": ["a", "a", None, None, None, "b"],
+            "article_link": ["x", "y", "l", "l", None, "l"],
+            "n": range(6),
+        }
+    )
+    assert _dedupe(df)["n"].to_list() == [0, 2, 4, 5]
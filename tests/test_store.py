@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+
+import polars as pl
+import pytest
+
+from j_staget import SQLiteStore, cli, fetch, iter_pages
+
+
+def test_write_pages_and_upsert(fake_session, tmp_path):
+    path = tmp_path / "corpus.db"
+    with SQLiteStore(path) as store:
+        for page in iter_pages("x", step=10, sleep=0, session=fake_session(25)):
+            store.write(page)
+        assert len(store) == 25
+        # 同じ結果をもう一度書いても増えない（doi か article_link で上書き）
+        store.write(fetch("x", sleep=0, session=fake_session(30)).df)
+        assert len(store) == 30
+
+    with SQLiteStore(path) as store:
+        row = store.connection.execute("SELECT author, pubyear FROM records WHERE doi = '10.1234/x.3'").fetchone()
+        assert json.loads(row[0]) == ["太郎 3", "花子 3"]
+        assert row[1] == 2003
+        indexes = {r[0] for r in store.connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"records_pubyear", "records_cdjournal", "records_p_issn", "records_o_issn"} <= indexes
+        plan = " ".join(r[-1] for r in store.connection.execute("EXPLAIN QUERY PLAN SELECT * FROM records WHERE pubyear = 2001"))
+        assert "records_pubyear" in plan
+
+
+def _frame(rows):
+    from j_staget._columns import SCHEMA
+
+    return pl.DataFrame(rows, schema={c: SCHEMA[c] for c in ("doi", "article_link", "article_title")}).with_columns(
+        [pl.lit(None, dtype=SCHEMA[c]).alias(c) for c in SCHEMA if c not in ("doi", "article_link", "article_title")]
+    )
+
+
+def test_doi_with_article_link_fallback():
+    store = SQLiteStore()
+    store.write(_frame([{"doi": None, "article_link": "L1", "article_title": "old"}, {"doi": None, "article_link": None, "article_title": "anon"}]))
+    store.write(_frame([{"doi": None, "article_link": "L1", "article_title": "new"}]))
+    assert len(store) == 2
+    assert store.connection.execute("SELECT article_title FROM records WHERE article_link = 'L1'").fetchall() == [("new",)]
+
+    # DOI が付いたら、DOI 無しで入っていた同じ article_link の行と置き換わる
+    store.write(_frame([{"doi": "10.1/a", "article_link": "L1", "article_title": "with doi"}]))
+    assert store.connection.execute("SELECT doi, article_title FROM records WHERE article_link = 'L1'").fetchall() == [
+        ("10.1/a", "with doi")
+    ]
+    # DOI 付きで入っているリンクを DOI 無しで書いても増えない
+    store.write(_frame([{"doi": None, "article_link": "L1", "article_title": "stale"}]))
+    store.write(_frame([{"doi": "10.1/a", "article_link": "L2", "article_title": "moved"}]))
+    assert store.connection.execute("SELECT article_link, article_title FROM records WHERE doi = '10.1/a'").fetchall() == [
+        ("L2", "moved")
+    ]
+    # doi も article_link も無い行は重複を判定できないので毎回入る
+    store.write(_frame([{"doi": None, "article_link": None, "article_title": "anon"}]))
+    assert len(store) == 3
+
+
+def test_cli_sqlite_out(fake_session, monkeypatch, tmp_path):
+    s = fake_session(25)
+    monkeypatch.setattr("j_staget.client.requests.Session", lambda: s)
+    out = tmp_path / "corpus.sqlite"
+    assert cli.main(["x", "--sleep", "0", "--out", str(out)]) == 0
+    with SQLiteStore(out) as store:
+        assert len(store) == 25
+
+    with pytest.raises(SystemExit):
+        cli.main(["x", "--out", str(tmp_path / "a.txt")])
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import io
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from j_staget import (
+    ArrowStreamPageWriter,
+    HivePartitionedWriter,
+    JStageAPIError,
+    ParquetPageWriter,
+    cli,
+    fetch,
+    iter_pages,
+)
+
+
+def test_one_row_group_per_page(fake_session, tmp_path):
+    out = tmp_path / "a.parquet"
+    with ParquetPageWriter(out) as w:
+        for page in iter_pages("x", step=10, sleep=0, session=fake_session(25)):
+            w.write(page)
+    md = pq.ParquetFile(out).metadata
+    assert [md.row_group(i).num_rows for i in range(md.num_row_groups)] == [10, 10, 5]
+    assert pl.read_parquet(out).equals(fetch("x", step=10, sleep=0, session=fake_session(25)).df)
+
+
+def test_row_group_size_and_compression(fake_session, tmp_path):
+    out = tmp_path / "a.parquet"
+    with ParquetPageWriter(out, row_group_size=15, compression="snappy") as w:
+        for page in iter_pages("x", step=10, sleep=0, session=fake_session(35)):
+            w.write(page)
+    md = pq.ParquetFile(out).metadata
+    assert [md.row_group(i).num_rows for i in range(md.num_row_groups)] == [15, 15, 5]
+    assert md.row_group(0).column(0).compression == "SNAPPY"
+
+    with pytest.raises(ValueError):
+        ParquetPageWriter(out, compression="lzma")
+    with pytest.raises(ValueError):
+        ParquetPageWriter(out, row_group_size=0)
+
+
+def test_partial_file_is_readable_after_a_failure(fake_session, tmp_path):
+    out = tmp_path / "a.parquet"
+    s = fake_session(50, fail=lambda start: 500 if start > 20 else None)
+    with pytest.raises(JStageAPIError), ParquetPageWriter(out) as w:
+        for page in iter_pages("x", step=10, sleep=0, session=s):
+            w.write(page)
+    assert pl.read_parquet(out).height == 20
+
+
+def test_empty_result_keeps_the_schema(tmp_path):
+    out = tmp_path / "a.parquet"
+    ParquetPageWriter(out).close()
+    df = pl.read_parquet(out)
+    assert df.height == 0
+    assert "doi" in df.columns
+
+
+def test_cli_streams_parquet(fake_session, monkeypatch, tmp_path):
+    s = fake_session(25)
+    monkeypatch.setattr("j_staget.client.requests.Session", lambda: s)
+    out = tmp_path / "out" / "a.parquet"
+    argv = ["x", "--sleep", "0", "--out", str(out), "--row-group-size", "20", "--compression", "gzip"]
+    assert cli.main(argv) == 0
+    md = pq.ParquetFile(out).metadata
+    assert md.num_rows == 25
+    assert md.row_group(0).num_rows == 20
+    assert md.row_group(0).column(0).compression == "GZIP"
+
+    with pytest.raises(SystemExit):
+        cli.main(["x", "--out", str(tmp_path / "a.txt")])
+
+
+def test_cli_ndjson_to_stdout(fake_session, monkeypatch, capsysbinary):
+    s = fake_session(25)
+    monkeypatch.setattr("j_staget.client.requests.Session", lambda: s)
+    assert cli.main(["x", "--sleep", "0", "--format", "ndjson"]) == 0
+    out = capsysbinary.readouterr().out
+    assert len(out.splitlines()) == 25
+    expected = fetch("x", sleep=0, session=fake_session(25)).df
+    assert pl.read_ndjson(out, schema=expected.schema).equals(expected)
+
+
+def test_cli_arrow_stream_to_stdout(fake_session, monkeypatch, capsysbinary):
+    s = fake_session(25)
+    monkeypatch.setattr("j_staget.client.requests.Session", lambda: s)
+    assert cli.main(["x", "--sleep", "0", "--format", "arrow"]) == 0
+    reader = pa.ipc.open_stream(capsysbinary.readouterr().out)
+    batches = list(reader)
+    assert sum(b.num_rows for b in batches) == 25
+    expected = fetch("x", sleep=0, session=fake_session(25)).df
+    assert pl.from_arrow(pa.Table.from_batches(batches)).equals(expected)
+
+    with pytest.raises(SystemExit):
+        cli.main(["x", "--format", "arrow", "--out", "a.parquet"])
+
+
+def test_arrow_stream_of_an_empty_result():
+    sink = io.BytesIO()
+    ArrowStreamPageWriter(sink).close()
+    reader = pa.ipc.open_stream(sink.getvalue())
+    assert "doi" in reader.schema.names
+    assert list(reader) == []
+
+
+def test_hive_partitioned_dataset(fake_session, tmp_path):
+    with HivePartitionedWriter(tmp_path, max_open=3) as w:
+        for page in iter_pages("x", step=10, sleep=0, session=fake_session(45)):
+            w.write(page)
+    # pubyear は 2000 + i % 10、cdjournal は jnl{i % 2} なので 10 パーティション
+    assert w.partitions == 10
+    assert sorted(p.name for p in tmp_path.iterdir()) == [f"pubyear={y}" for y in range(2000, 2010)]
+    parts = list((tmp_path / "pubyear=2001" / "cdjournal=jnl1").glob("part-*.parquet"))
+    # どのページにも全パーティションが現れ、同時に開くのは 3 ファイルまでなので、ページごとに次の part ファイルになる
+    assert len(parts) == 5
+    assert "pubyear" not in pl.read_parquet(parts[0]).columns
+
+    expected = fetch("x", sleep=0, session=fake_session(45)).df
+    got = pl.scan_parquet(tmp_path, hive_partitioning=True).filter(pl.col("pubyear") == 2001).collect()
+    assert sorted(got["doi"].drop_nulls()) == sorted(expected.filter(pl.col("pubyear") == 2001)["doi"].drop_nulls())
+    assert pl.scan_parquet(tmp_path, hive_partitioning=True).select(pl.len()).collect().item() == 45
+
+
+def test_hive_null_and_escaped_values(tmp_path):
+    df = pl.DataFrame({"pubyear": pl.Series([2001, None], dtype=pl.Int32), "cdjournal": ["a/b", None], "doi": ["1", "2"]})
+    with HivePartitionedWriter(tmp_path) as w:
+        w.write(df)
+    assert (tmp_path / "pubyear=2001" / "cdjournal=a%2Fb").is_dir()
+    assert (tmp_path / "pubyear=__HIVE_DEFAULT_PARTITION__" / "cdjournal=__HIVE_DEFAULT_PARTITION__").is_dir()
+    got = pl.read_parquet(tmp_path, hive_partitioning=True).sort("doi")
+    assert got["cdjournal"].to_list() == ["a/b", None]
+
+    with pytest.raises(ValueError):
+        HivePartitionedWriter(tmp_path, partition_by=["author"])
+
+
+def test_cli_partition_by(fake_session, monkeypatch, tmp_path):
+    s = fake_session(25)
+    monkeypatch.setattr("j_staget.client.requests.Session", lambda: s)
+    out = tmp_path / "corpus"
+    assert cli.main(["x", "--sleep", "0", "--out", str(out), "--partition-by", "cdjournal"]) == 0
+    assert sorted(p.name for p in out.iterdir()) == ["cdjournal=jnl0", "cdjournal=jnl1"]
+    assert pl.read_parquet(out, hive_partitioning=True).height == 25
+
+    with pytest.raises(SystemExit):
+        cli.main(["x", "--out", str(out), "--partition-by", "nope"])
+    with pytest.raises(SystemExit):
+        cli.main(["x", "--partition-by", "pubyear"])
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from conftest import make_page
+from lxml import etree
+
+from j_staget._header import NS
+from j_staget._xml import extract_row, row_xpath
+
+EDGE_ENTRIES = [
+    # ja が空白だけ -> en にフォールバック、複数 article_title の 2 個目に ja
+    (
+        "<entry><article_title><en>A</en><ja> </ja></article_title>"
+        "<article_title><ja><![CDATA[ 二番目 ]]></ja></article_title></entry>"
+    ),
+    # ja の中で子要素の tail がテキスト、コメント混在
+    "<entry><material_title><ja><!--c--><b>x</b> tail </ja></material_title></entry>",
+    # author: ja に name が無ければ author/name を使う
+    "<entry><author><ja/><name> N1 </name><name/></author><author><name>N2</name></author></entry>",
+    # cdvols: 空白のみは "" として残る、2 個目は無視
+    "<entry><cdvols> </cdvols><cdvols>2</cdvols></entry>",
+    # 名前空間違いは get_first 系では拾わない / 空要素はスキップ
+    (
+        "<entry><x:doi xmlns:x='urn:x'>no</x:doi><prism:doi/><prism:doi>10.1/a</prism:doi>"
+        "<pubyear> 2001 </pubyear></entry>"
+    ),
+    "<entry/>",
+]
+
+
+def _entries(xml: bytes):
+    return etree.fromstring(xml).xpath("//atom:entry", namespaces=NS)
+
+
+def test_extract_row_matches_xpath_rules():
+    for entry in _entries(make_page(1, 60, 60)):
+        assert extract_row(entry) == row_xpath(entry)
+
+
+def test_extract_row_edge_cases():
+    feed = (
+        '<feed xmlns="http://www.w3.org/2005/Atom" '
+        'xmlns:prism="http://prismstandard.org/namespaces/basic/2.0/">'
+        + "".join(EDGE_ENTRIES)
+        + "</feed>"
+    )
+    entries = _entries(feed.encode())
+    assert len(entries) == len(EDGE_ENTRIES)
+    for entry in entries:
+        assert extract_row(entry) == row_xpath(entry)
+
+
+def test_column_builder_matches_dict_frame():
+    import polars as pl
+
+    from j_staget._columns import ColumnBuilder
+    from j_staget._xml import extract_values
+
+    entries = _entries(make_page(1, 60, 60))
+    b = ColumnBuilder()
+    for e in entries:
+        b.append(extract_values(e))
+
+    # 従来の list[dict] -> DataFrame -> cast と同じ結果になること
+    legacy = pl.DataFrame([extract_row(e) for e in entries]).with_columns(
+        pl.col("pubyear").cast(pl.Int32, strict=False),
+        pl.col("starting_page").cast(pl.Int32, strict=False),
+        pl.col("ending_page").cast(pl.Int32, strict=False),
+        pl.when(pl.col("doi").is_not_null())
+        .then(pl.concat_str([pl.lit("https://doi.org/"), pl.col("doi")]))
+        .otherwise(None)
+        .alias("url_doi"),
+    )
+    assert b.to_frame().equals(legacy)
+    assert ColumnBuilder().to_frame().columns == legacy.columns